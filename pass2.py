@@ -1,62 +1,18 @@
 import argparse
-import hashlib
 import logging
-import time
-from mnemonic import Mnemonic
-from colorama import init, Fore, Style
 
-# Initialize colorama for cross-platform colored output
-init(autoreset=True)
+from pypassgen.console import Fore, Style, init_colors
+from pypassgen.derivation import generate_password_from_mnemonic
+from pypassgen.phrases import generate_mnemonic_phrases
+# Also defined by the original script, re-exported for code that imports it from here
+from pypassgen.wordlist import is_valid_mnemonic_phrase
 
-def is_valid_mnemonic_phrase(mnemonic_phrase):
-    """Check if the provided mnemonic phrase is valid."""
-    valid_lengths = [12, 18, 24]
-    word_count = len(mnemonic_phrase.split())
-    return word_count in valid_lengths
-
-def generate_password_from_mnemonic(mnemonic_phrase, password_length=12, use_symbols=True):
-    logger = logging.getLogger(__name__)
-
-    # Validate mnemonic phrase
-    if not is_valid_mnemonic_phrase(mnemonic_phrase):
-        logger.error(Fore.RED + "Invalid mnemonic phrase. Must be 12, 18, or 24 words.")
-        raise ValueError("Mnemonic phrase must be 12, 18, or 24 words.")
-
-    # Generate seed from mnemonic phrase using BIP39 seed derivation
-    logger.info(Fore.GREEN + "Generating seed from mnemonic phrase using BIP39...")
-    seed = Mnemonic.to_seed(mnemonic_phrase)
-
-    # Use PBKDF2-HMAC-SHA512 to derive a secure key
-    logger.info(Fore.GREEN + "Deriving secure key using PBKDF2-HMAC-SHA512...")
-    key = hashlib.pbkdf2_hmac('sha512', seed, b'password', 8192)
-
-    # Determine character set for password
-    characters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
-    if use_symbols:
-        characters += "!@#$%^&*()_+-=[]{};:,.<>?~"
-
-    # Generate password character-by-character using PBKDF2-HMAC-SHA512
-    logger.info(Fore.GREEN + f"Generating password of length {password_length} characters...")
-    start_time = time.time()  # Start timing password generation
-    password = []
-    try:
-        while len(password) < password_length:
-            index = int.from_bytes(
-                hashlib.pbkdf2_hmac('sha512', key, str(len(password)).encode(), 1000000), 'big'
-            ) % len(characters)
-            password.append(characters[index])
-    except Exception as e:
-        logger.error(Fore.RED + f"Error generating password: {e}")
-        raise
-
-    end_time = time.time()  # End timing password generation
-    logger.info(Fore.GREEN + f"Password generated successfully in {end_time - start_time:.6f} seconds.")
-    return ''.join(password)
+__all__ = ["generate_mnemonic_phrases", "generate_password_from_mnemonic", "is_valid_mnemonic_phrase", "main"]
 
 def main():
     parser = argparse.ArgumentParser(
         description=f"{Fore.CYAN}Generate BIP 39 compatible mnemonic phrases and save to a file, or generate a password from a mnemonic phrase.{Style.RESET_ALL}",
-        usage=f"{Fore.GREEN}%(prog)s [--mnemonic PHRASE] | [--auto] [-p N] [-w {{12,15,18,21,24}}] [-o FILE] [--password-length N] [--use-symbols]{Style.RESET_ALL}",
+        usage=f"{Fore.GREEN}%(prog)s [--mnemonic PHRASE] | [--auto] [-p N] [-w {{12,15,18,21,24}}] [-o FILE] [--password-length N] [--use-symbols] [--workers N] [--no-checksum]{Style.RESET_ALL}",
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument(
@@ -79,6 +35,14 @@ def main():
         "--use-symbols", action='store_true', 
         help=f"{Fore.YELLOW}Include symbols in the generated password{Style.RESET_ALL}"
     )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help=f"{Fore.YELLOW}Number of parallel workers for password derivation (0 = all CPU cores; default: 1){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--no-checksum", action='store_true',
+        help=f"{Fore.YELLOW}Accept phrases whose BIP39 checksum does not match (e.g. 12-21 word phrases from older versions){Style.RESET_ALL}"
+    )
     parser.add_argument(
         "--auto", action='store_true', 
         help=f"{Fore.YELLOW}Automatically generate mnemonic phrases and passwords{Style.RESET_ALL}"
@@ -95,11 +59,13 @@ def main():
     output_file = args.output
     password_length = args.password_length
     use_symbols = args.use_symbols
+    workers = args.workers
     auto_generate = args.auto
     mnemonic_phrase = args.mnemonic
+    verify_checksum = not args.no_checksum
 
     # Initialize colorama for cross-platform ANSI color support
-    init()
+    init_colors()
 
     # Configure logging
     logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -110,15 +76,15 @@ def main():
 
         if mnemonic_phrase:
             # Generate password from provided mnemonic phrase
-            password = generate_password_from_mnemonic(mnemonic_phrase, password_length=password_length, use_symbols=use_symbols)
+            password = generate_password_from_mnemonic(mnemonic_phrase, password_length=password_length, use_symbols=use_symbols, workers=workers,
+                                                       verify_checksum=verify_checksum)
             print(f"{Fore.YELLOW}Generated Password: {password}{Style.RESET_ALL}")
 
         elif auto_generate:
             # Automatically generate mnemonic phrases and passwords
             generated_phrases = []
-            for _ in range(num_phrases):
-                mnemonic_phrase = Mnemonic("english").generate(strength=256)
-                password = generate_password_from_mnemonic(mnemonic_phrase, password_length=password_length, use_symbols=use_symbols)
+            for mnemonic_phrase in generate_mnemonic_phrases(num_phrases, 24):
+                password = generate_password_from_mnemonic(mnemonic_phrase, password_length=password_length, use_symbols=use_symbols, workers=workers)
                 generated_phrases.append((mnemonic_phrase, password))
 
             # Print generated phrases and passwords
@@ -128,9 +94,8 @@ def main():
         else:
             # Generate mnemonic phrases
             mnemonic_phrases = []
-            for _ in range(num_phrases):
-                mnemonic_phrase = Mnemonic("english").generate(strength=256)
-                password = generate_password_from_mnemonic(mnemonic_phrase, password_length=password_length, use_symbols=use_symbols)
+            for mnemonic_phrase in generate_mnemonic_phrases(num_phrases, 24):
+                password = generate_password_from_mnemonic(mnemonic_phrase, password_length=password_length, use_symbols=use_symbols, workers=workers)
                 mnemonic_phrases.append((mnemonic_phrase, password))
 
             if output_file:
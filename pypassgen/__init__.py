@@ -0,0 +1,15 @@
+"""Deterministic passwords and BIP39 mnemonic phrases.
+
+Submodules are imported on demand and do no work at import time, so that
+command line startup and pool worker spawns stay cheap:
+
+- ``wordlist``: the bundled BIP39 wordlist and phrase validation
+- ``kdf``: key derivation backends and work factor profiles
+- ``derivation``: password derivation, the derivation cache and PasswordVault
+- ``phrases``: bulk phrase generation, text output and the packed format
+- ``dedup``: the persistent index that keeps generated phrases unique
+- ``batch`` and ``server``: process pool derivation for files and clients
+- ``metrics``: optional span and counter instrumentation
+- ``records``: text, JSON lines and CSV output records
+- ``cli``, ``generator_cli`` and ``bench``: command line entry points
+"""
@@ -0,0 +1,126 @@
+import asyncio
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .derivation import (PASSWORD_SCHEMES, derive_character_digest, derive_stage1_key, derive_v2_password,
+                         password_characters, wipe_buffer)
+from .kdf import DEFAULT_PROFILE, profile_kdf
+from .metrics import get_instrumentation
+
+# Progress of one derivation. ``done`` and ``total`` count expensive steps
+# (characters for legacy, the single master key for v2); ``eta`` is None
+# until the first step finished and ``password`` is only set on the last update.
+DerivationProgress = namedtuple("DerivationProgress", ["done", "total", "elapsed", "eta", "password"])
+
+class AsyncPasswordDeriver:
+    """Derive passwords from asyncio code without blocking the event loop.
+
+    Every expensive step (the stage-1 key, each legacy character, the v2
+    master key) runs on a thread pool; hashlib releases the GIL, so the
+    steps of concurrent derivations run in parallel. A semaphore shared by
+    all derivations admits ``max_concurrency`` steps at a time and is taken
+    again for every character, so a long password cannot starve shorter
+    ones. Cancelling a derivation (directly or through ``asyncio.wait_for``
+    / ``asyncio.timeout``) takes effect after the step that is running,
+    because a PBKDF2 call cannot be interrupted once started.
+    """
+
+    def __init__(self, max_concurrency=None, executor=None):
+        self.max_concurrency = max_concurrency or os.cpu_count() or 1
+        self._own_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(max_workers=self.max_concurrency)
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def close(self):
+        """Shut down the thread pool if it was created by this deriver."""
+        if self._own_executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, function, *args):
+        async with self._semaphore:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, partial(function, *args))
+
+    async def iter_progress(self, mnemonic_phrase, password_length=12, use_symbols=True, scheme="legacy", label=b"",
+                            cache=None, verify_checksum=True, profile=None):
+        """Async iterator of DerivationProgress updates; the last one carries the password."""
+        if scheme not in PASSWORD_SCHEMES:
+            raise ValueError(f"Unknown password scheme '{scheme}'. Choose from: {', '.join(PASSWORD_SCHEMES)}.")
+        profile = profile or DEFAULT_PROFILE
+        kdf = profile_kdf(profile)
+        characters = password_characters(use_symbols)
+        start_time = time.monotonic()
+
+        key = await self._run(derive_stage1_key, mnemonic_phrase, verify_checksum, profile["stage1_iterations"])
+        try:
+            async for update in self._derive_steps(key, characters, password_length, scheme, label, cache, kdf, start_time):
+                yield update
+        finally:
+            # Also runs when the derivation is cancelled or the iterator is closed early
+            wipe_buffer(key)
+
+    async def _derive_steps(self, key, characters, password_length, scheme, label, cache, kdf, start_time):
+        if scheme == "v2":
+            yield DerivationProgress(0, 1, time.monotonic() - start_time, None, None)
+            password = await self._run(derive_v2_password, key, characters, password_length, label, 1000000, kdf)
+            get_instrumentation().count("passwords")
+            yield DerivationProgress(1, 1, time.monotonic() - start_time, 0.0, "".join(password))
+            return
+
+        if password_length <= 0:
+            # Nothing to derive; the only update is also the last one, like the sync API returning ""
+            get_instrumentation().count("passwords")
+            yield DerivationProgress(0, 0, time.monotonic() - start_time, 0.0, "")
+            return
+
+        fingerprint = cache.fingerprint(key, kdf) if cache is not None else None
+        password = []
+        yield DerivationProgress(0, password_length, time.monotonic() - start_time, None, None)
+        character_start = time.monotonic()
+        for position in range(password_length):
+            digest = cache.get(fingerprint, label, position) if cache is not None else None
+            if digest is None:
+                digest = await self._run(derive_character_digest, key, position, label, 1000000, kdf)
+                if cache is not None:
+                    cache.put(fingerprint, label, position, digest)
+            password.append(characters[int.from_bytes(digest, 'big') % len(characters)])
+
+            done = position + 1
+            elapsed = time.monotonic() - start_time
+            eta = (time.monotonic() - character_start) / done * (password_length - done)
+            if done == password_length:
+                get_instrumentation().count("passwords")
+                yield DerivationProgress(done, password_length, elapsed, 0.0, "".join(password))
+            else:
+                yield DerivationProgress(done, password_length, elapsed, eta, None)
+
+    async def derive(self, mnemonic_phrase, password_length=12, use_symbols=True, scheme="legacy", label=b"", cache=None,
+                     verify_checksum=True, profile=None, progress=None):
+        """Derive one password; progress, if given, is called with every DerivationProgress update."""
+        password = None
+        async for update in self.iter_progress(mnemonic_phrase, password_length=password_length, use_symbols=use_symbols,
+                                               scheme=scheme, label=label, cache=cache, verify_checksum=verify_checksum,
+                                               profile=profile):
+            if progress is not None:
+                progress(update)
+            password = update.password
+        return password
+
+async def generate_password_from_mnemonic_async(mnemonic_phrase, password_length=12, use_symbols=True, scheme="legacy",
+                                                verify_checksum=True, profile=None, progress=None, deriver=None):
+    """Async counterpart of generate_password_from_mnemonic; pass a shared deriver to limit concurrency across calls."""
+    if deriver is not None:
+        return await deriver.derive(mnemonic_phrase, password_length=password_length, use_symbols=use_symbols, scheme=scheme,
+                                    verify_checksum=verify_checksum, profile=profile, progress=progress)
+    async with AsyncPasswordDeriver() as deriver:
+        return await deriver.derive(mnemonic_phrase, password_length=password_length, use_symbols=use_symbols, scheme=scheme,
+                                    verify_checksum=verify_checksum, profile=profile, progress=progress)
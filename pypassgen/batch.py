@@ -0,0 +1,81 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, as_completed, wait
+from functools import partial
+
+from .derivation import generate_password_from_mnemonic
+from .wordlist import check_mnemonic_phrase, get_wordlist
+
+def read_mnemonic_lines(input_file):
+    """Yield (line_number, mnemonic_phrase) pairs from a file, skipping blank lines."""
+    with open(input_file, "r") as file:
+        for line_number, line in enumerate(file, start=1):
+            mnemonic_phrase = " ".join(line.split())
+            if mnemonic_phrase:
+                yield line_number, mnemonic_phrase
+
+def _derive_batch_password(item, password_length, use_symbols, scheme, verify_checksum, profile):
+    # Runs inside a pool process, so failures are returned instead of raised
+    # to keep one bad line from aborting the whole batch.
+    line_number, mnemonic_phrase = item
+    start_time = time.perf_counter()
+    try:
+        password = generate_password_from_mnemonic(mnemonic_phrase, password_length=password_length, use_symbols=use_symbols,
+                                                   scheme=scheme, verify_checksum=verify_checksum, profile=profile)
+        return line_number, mnemonic_phrase, password, None, time.perf_counter() - start_time
+    except Exception as e:
+        return line_number, mnemonic_phrase, None, str(e), time.perf_counter() - start_time
+
+def derive_passwords_in_batch(items, password_length=12, use_symbols=True, workers=0, ordered=True, scheme="legacy",
+                              verify_checksum=True, profile=None, detailed=False):
+    """Derive passwords for (line_number, mnemonic_phrase) items on a process pool.
+
+    Yields (line_number, password, error) tuples as soon as they are available,
+    either in input order or in completion order. With ``detailed`` the tuples
+    are (line_number, mnemonic_phrase, password, error, seconds), seconds
+    being the time the worker spent on that line. At most two tasks per worker
+    are in flight at any time, so memory stays bounded for any input size.
+    Invalid phrases are rejected before they are sent to a worker.
+    """
+    for result in _derive_passwords_in_batch(items, password_length, use_symbols, workers, ordered, scheme, verify_checksum,
+                                             profile):
+        yield result if detailed else (result[0], result[2], result[3])
+
+def _derive_passwords_in_batch(items, password_length, use_symbols, workers, ordered, scheme, verify_checksum, profile):
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    max_pending = workers * 2
+    task = partial(_derive_batch_password, password_length=password_length, use_symbols=use_symbols, scheme=scheme,
+                   verify_checksum=verify_checksum, profile=profile)
+    items = iter(items)
+
+    # Build the wordlist before the pool forks so that every worker shares it
+    get_wordlist()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def submit(item):
+            reason = check_mnemonic_phrase(item[1], verify_checksum=verify_checksum)
+            if reason is None:
+                return executor.submit(task, item)
+            future = Future()
+            future.set_result((item[0], item[1], None, reason, 0.0))
+            return future
+
+        if ordered:
+            pending = deque()
+            for item in items:
+                pending.append(submit(item))
+                if len(pending) >= max_pending:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        else:
+            pending = set()
+            for item in items:
+                pending.add(submit(item))
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            for future in as_completed(pending):
+                yield future.result()
@@ -0,0 +1,217 @@
+import argparse
+import hashlib
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from .console import Fore, Style
+from .derivation import (derive_character_digest, derive_legacy_password, derive_stage1_key, derive_v2_password,
+                         generate_password_from_mnemonic)
+from .kdf import KDF_BACKENDS, KeyDerivation
+from .phrases import generate_mnemonic_phrases, write_phrases_to_file
+
+# Directory containing the pypassgen package, used as the working directory
+# of the startup measurements
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Commands whose startup time is measured; none of them derives a password
+STARTUP_COMMANDS = {
+    "help": ["-m", "pypassgen", "--help"],
+    "validate": ["-m", "pypassgen", "--validate", os.devnull],
+}
+
+SAMPLE_MNEMONIC = "drama coral never fluid require pole attend liar fun hammer hurt match update scare garbage pluck scrap valve catch primary basic borrow believe safe"
+
+def time_call(func, repeat):
+    """Run func repeat times and return (best, mean) wall-clock seconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), sum(timings) / len(timings)
+
+def measure_memory(func):
+    """Run func once under tracemalloc and return (peak_bytes, retained_bytes) above the starting point."""
+    func()  # Warm up lazy imports and the wordlist so only per-call memory is traced
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        func()
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak - start, current - start
+
+def measure_import_time(module):
+    """Return the seconds a fresh interpreter spends importing module, as reported by python -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"; the
+        # cumulative time of the module includes everything it imports
+        fields = line.split("|")
+        if len(fields) == 3 and fields[2].strip() == module:
+            return int(fields[1]) / 1e6
+    raise ValueError(f"No import time reported for '{module}'.")
+
+def result_key(result):
+    """Identify a benchmark result by its stage name and parameters."""
+    return result["name"] + json.dumps(result["params"], sort_keys=True)
+
+def run_benchmarks(password_lengths, worker_counts, phrase_counts, repeat=3):
+    """Time every stage of the derivation and generation pipelines and return the results."""
+    results = []
+
+    def add_result(name, params, best, mean, stage_repeat):
+        results.append({"name": name, "params": params, "seconds": best, "mean": mean, "repeat": stage_repeat})
+        print(f"{Fore.CYAN}{name:<12}{Style.RESET_ALL} {json.dumps(params):<40} {best:.6f}s", file=sys.stderr)
+
+    def record(name, params, func, stage_repeat=repeat):
+        add_result(name, params, *time_call(func, stage_repeat), stage_repeat)
+
+    from mnemonic import Mnemonic
+
+    seed = Mnemonic.to_seed(SAMPLE_MNEMONIC)
+    key = derive_stage1_key(SAMPLE_MNEMONIC)
+    characters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+
+    # Key derivation stages
+    record("seed", {}, lambda: Mnemonic.to_seed(SAMPLE_MNEMONIC))
+    record("stage1_key", {}, lambda: hashlib.pbkdf2_hmac('sha512', seed, b'password', 8192))
+    record("character", {}, lambda: derive_character_digest(key, 0), stage_repeat=1)
+    for name in KDF_BACKENDS:
+        # Each backend at its default parameters, for choosing one that meets the policy
+        kdf = KeyDerivation(name)
+        record("kdf", {"kdf": name}, lambda: kdf(key, b'0'), stage_repeat=1)
+
+    # Interpreter startup for modes that must not pay for derivation imports
+    import_timings = [measure_import_time("pypassgen.cli") for _ in range(repeat)]
+    add_result("import", {"module": "pypassgen.cli"}, min(import_timings), sum(import_timings) / repeat, repeat)
+    for command, arguments in STARTUP_COMMANDS.items():
+        record("startup", {"command": command},
+               lambda: subprocess.run([sys.executable] + arguments, cwd=PROJECT_ROOT, capture_output=True, check=True))
+
+    # Whole passwords, per scheme, length and worker count
+    for password_length in password_lengths:
+        for workers in worker_counts:
+            record("legacy", {"length": password_length, "workers": workers},
+                   lambda: derive_legacy_password(key, characters, password_length, workers=workers), stage_repeat=1)
+        record("v2", {"length": password_length},
+               lambda: derive_v2_password(key, characters, password_length), stage_repeat=1)
+
+    # Memory per password with a single-iteration work factor, so that the
+    # allocations around the KDF calls are measured rather than their cost
+    cheap_profile = {"stage1_iterations": 1, "character_iterations": 1}
+    for password_length in password_lengths:
+        derive = lambda: generate_password_from_mnemonic(SAMPLE_MNEMONIC, password_length, profile=cheap_profile)
+        peak_bytes, retained_bytes = measure_memory(derive)
+        record("memory", {"length": password_length}, derive)
+        results[-1].update(peak_bytes=peak_bytes, retained_bytes=retained_bytes)
+        print(f"{'':<12} peak {peak_bytes} bytes, retained {retained_bytes} bytes", file=sys.stderr)
+
+    # Phrase generation and file writing
+    with tempfile.TemporaryDirectory() as directory:
+        for phrase_count in phrase_counts:
+            record("generate", {"phrases": phrase_count}, lambda: generate_mnemonic_phrases(phrase_count, 24))
+            phrases = generate_mnemonic_phrases(phrase_count, 24)
+            output_file = os.path.join(directory, "phrases.txt")
+            record("write", {"phrases": phrase_count}, lambda: write_phrases_to_file(phrases, output_file))
+
+    return results
+
+def compare_results(results, baseline, threshold):
+    """Return (name, params, baseline_seconds, seconds) for every result slower than baseline by more than threshold."""
+    baseline_seconds = {result_key(result): result["seconds"] for result in baseline["results"]}
+    regressions = []
+    for result in results:
+        reference = baseline_seconds.get(result_key(result))
+        if reference is not None and result["seconds"] > reference * (1 + threshold):
+            regressions.append((result["name"], result["params"], reference, result["seconds"]))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=f"{Fore.CYAN}Benchmark the password derivation and mnemonic generation pipelines.{Style.RESET_ALL}",
+        usage=f"{Fore.GREEN}%(prog)s [--lengths N ...] [--workers N ...] [--phrases N ...] [--repeat N] [-o FILE] [--baseline FILE [--threshold F]] [--startup-budget-ms MS]{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--lengths", type=int, nargs="+", default=[4, 16],
+        help=f"{Fore.YELLOW}Password lengths to benchmark (default: 4 16){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}),
+        help=f"{Fore.YELLOW}Worker counts for the legacy scheme (default: 1 and the CPU count){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--phrases", type=int, nargs="+", default=[10000, 100000],
+        help=f"{Fore.YELLOW}Phrase counts for generation and writing (default: 10000 100000){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help=f"{Fore.YELLOW}Repetitions for the cheap stages; the best time is reported (default: 3){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "-o", "--output", type=str, default=None,
+        help=f"{Fore.YELLOW}Write the JSON results to this file instead of stdout{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--baseline", type=str, default=None,
+        help=f"{Fore.YELLOW}Compare against saved JSON results and exit with status 1 on regressions{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--threshold", type=float, default=0.10,
+        help=f"{Fore.YELLOW}Allowed slowdown relative to the baseline (default: 0.10 = 10%%){Style.RESET_ALL}"
+    )
+
+    parser.add_argument(
+        "--startup-budget-ms", type=float, default=None,
+        help=f"{Fore.YELLOW}Exit with status 1 if importing pypassgen.cli (python -X importtime) takes longer than this{Style.RESET_ALL}"
+    )
+
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.lengths, args.workers, args.phrases, repeat=args.repeat)
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        },
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.startup_budget_ms is not None:
+        import_seconds = next(result["seconds"] for result in results if result["name"] == "import")
+        if import_seconds * 1000 > args.startup_budget_ms:
+            print(f"{Fore.RED}Startup over budget: importing pypassgen.cli took {import_seconds * 1000:.1f}ms "
+                  f"(budget {args.startup_budget_ms:.1f}ms){Style.RESET_ALL}", file=sys.stderr)
+            sys.exit(1)
+        print(f"{Fore.GREEN}Importing pypassgen.cli took {import_seconds * 1000:.1f}ms, within the "
+              f"{args.startup_budget_ms:.1f}ms budget.{Style.RESET_ALL}", file=sys.stderr)
+
+    if args.baseline:
+        with open(args.baseline, "r") as file:
+            baseline = json.load(file)
+        regressions = compare_results(results, baseline, args.threshold)
+        for name, params, reference, seconds in regressions:
+            print(f"{Fore.RED}Regression: {name} {json.dumps(params)} {reference:.6f}s -> {seconds:.6f}s{Style.RESET_ALL}", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+        print(f"{Fore.GREEN}No regressions beyond {args.threshold:.0%} of the baseline.{Style.RESET_ALL}", file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,454 @@
+import argparse
+import json
+import logging
+import sys
+import time
+
+from .console import Fore, Style, disable_colors, init_colors
+from .derivation import PASSWORD_SCHEMES, PasswordVault, generate_password_from_mnemonic
+from .kdf import (DEFAULT_KDF, DEFAULT_PROFILE, KDF_BACKENDS, calibrate_profile, describe_profile, load_profile,
+                  parse_kdf_params, profile_kdf)
+from .metrics import MetricsRecorder, get_instrumentation, set_instrumentation
+from .phrases import iter_mnemonic_phrases, open_phrase_output, write_phrases_to_file
+from .records import OUTPUT_FORMATS, RecordFormatter, plain_output_requested
+from .wordlist import check_mnemonic_phrase, validate_mnemonic_file
+
+def main():
+    if plain_output_requested():
+        # Machine-readable output is never colored, so colorama is not even imported
+        disable_colors()
+
+    parser = argparse.ArgumentParser(
+        description=f"{Fore.CYAN}Generate BIP 39 compatible mnemonic phrases and save to a file, or generate a password from a mnemonic phrase.{Style.RESET_ALL}",
+        usage=f"{Fore.GREEN}%(prog)s [-p N] [-w {{12,15,18,21,24}}] [-o FILE|-] [--compress {{gzip,zstd}}] [--progress] [--metrics-out FILE] [--output-format {{text,jsonl,csv}}] [--dedup-index DIR [--dedup-capacity N] [--dedup-fp-rate P]] --mnemonic PHRASE --password-length N --use-symbols [--workers N] [--scheme {{legacy,v2}}] [--batch-input FILE [--unordered] [--shard K/N] [--journal FILE [--checkpoint-interval S]]] [--merge-journals JOURNAL ...] [--site NAME] [--sites-file FILE] [--no-checksum] [--validate FILE] [--serve [--socket PATH | --host HOST --port N] [--client-concurrency N]] [--calibrate --target-ms N] [--profile FILE] [--kdf NAME [--kdf-param NAME=VALUE ...]]{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "-p", "--phrases", type=int, default=1,
+        help=f"{Fore.YELLOW}Number of mnemonic phrases to generate (default: 1){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "-w", "--words", type=int, default=12, choices=[12, 15, 18, 21, 24],
+        help=f"{Fore.YELLOW}Number of words per phrase (choices: 12, 15, 18, 21, 24; default: 12){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "-o", "--output", type=str, default=None,
+        help=f"{Fore.YELLOW}Output file to save generated phrases ('-' for stdout; .gz/.zst names are compressed){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--compress", type=str, default=None, choices=["gzip", "zstd"],
+        help=f"{Fore.YELLOW}Compress the output file (default: detected from the file extension){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--progress", action='store_true',
+        help=f"{Fore.YELLOW}Log progress while writing phrases to the output file{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--metrics-out", type=str, default=None,
+        help=f"{Fore.YELLOW}Collect timing and count metrics and write them to this file at exit (.json/.jsonl for JSON lines, Prometheus text otherwise){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--output-format", type=str, default="text", choices=OUTPUT_FORMATS,
+        help=f"{Fore.YELLOW}Format of phrase and password output: colored text, or uncolored JSON lines or CSV records (phrase/site/line, password, length, scheme, timing, work_factor, error) for other tools (default: text){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--dedup-index", type=str, default=None, metavar="DIR",
+        help=f"{Fore.YELLOW}Never issue a phrase twice: check generated phrases against this persistent index (created if missing) and add them to it{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--dedup-capacity", type=int, default=10000000,
+        help=f"{Fore.YELLOW}Phrases the Bloom filter of a new --dedup-index is sized for; it is rebuilt larger when exceeded (default: 10000000){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--dedup-fp-rate", type=float, default=0.001,
+        help=f"{Fore.YELLOW}Bloom filter false-positive rate of a new --dedup-index (default: 0.001){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--mnemonic", type=str, default=None,
+        help=f"{Fore.YELLOW}Mnemonic phrase to generate a password from{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--password-length", type=int, default=12,
+        help=f"{Fore.YELLOW}Length of the password to generate (default: 12){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--use-symbols", action='store_true', 
+        help=f"{Fore.YELLOW}Include symbols in the generated password{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help=f"{Fore.YELLOW}Number of parallel workers for password derivation (0 = all CPU cores; default: 1){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--scheme", type=str, default="legacy", choices=PASSWORD_SCHEMES,
+        help=f"{Fore.YELLOW}Password derivation scheme (choices: legacy, v2; default: legacy){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--batch-input", type=str, default=None,
+        help=f"{Fore.YELLOW}File with one mnemonic phrase per line to derive passwords for in batch (uses --workers processes){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--unordered", action='store_true',
+        help=f"{Fore.YELLOW}Write batch results as soon as they finish instead of in input order{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--journal", type=str, default=None,
+        help=f"{Fore.YELLOW}Run --batch-input as a resumable job recording results in this append-only journal; rerun to resume{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--shard", type=str, default=None, metavar="K/N",
+        help=f"{Fore.YELLOW}Only process the lines of --batch-input that belong to shard K of N (e.g. 2/4){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--checkpoint-interval", type=float, default=10.0,
+        help=f"{Fore.YELLOW}Seconds between --journal checkpoints (default: 10){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--merge-journals", type=str, nargs="+", default=None, metavar="JOURNAL",
+        help=f"{Fore.YELLOW}Merge the --journal files of all shards into line_number<TAB>password output{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--site", type=str, action='append', default=[],
+        help=f"{Fore.YELLOW}Site or account name to derive a password for from --mnemonic (repeatable){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--sites-file", type=str, default=None,
+        help=f"{Fore.YELLOW}File with one site or account name per line to derive passwords for from --mnemonic{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--no-checksum", action='store_true',
+        help=f"{Fore.YELLOW}Accept phrases whose BIP39 checksum does not match (e.g. 12-21 word phrases from older versions){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--validate", type=str, default=None,
+        help=f"{Fore.YELLOW}Check every line of a file for a valid BIP39 phrase and report the invalid lines{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--serve", action='store_true',
+        help=f"{Fore.YELLOW}Run as a server answering JSON derivation requests with a warm pool of --workers processes{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--socket", type=str, default=None,
+        help=f"{Fore.YELLOW}Unix socket path for --serve (default: TCP on --host/--port){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--host", type=str, default="127.0.0.1",
+        help=f"{Fore.YELLOW}TCP host for --serve (default: 127.0.0.1){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--port", type=int, default=8765,
+        help=f"{Fore.YELLOW}TCP port for --serve (default: 8765){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--client-concurrency", type=int, default=4,
+        help=f"{Fore.YELLOW}Maximum requests in flight per --serve connection (default: 4){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--calibrate", action='store_true',
+        help=f"{Fore.YELLOW}Measure the --kdf speed and write a work factor profile for --target-ms to --profile (or stdout){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--target-ms", type=float, default=1000,
+        help=f"{Fore.YELLOW}Target latency per password character for --calibrate, in milliseconds (default: 1000){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--profile", type=str, default=None,
+        help=f"{Fore.YELLOW}Work factor profile file: written by --calibrate, read when deriving passwords (default: built-in iterations){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--kdf", type=str, default=None, choices=list(KDF_BACKENDS),
+        help=f"{Fore.YELLOW}Key derivation backend for the per-password work, overriding the profile (default: pbkdf2-sha512){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--kdf-param", type=str, action='append', default=[], metavar="NAME=VALUE",
+        help=f"{Fore.YELLOW}KDF parameter such as iterations=200000 or n=32768, r=8, p=1, maxmem=BYTES for scrypt; repeatable{Style.RESET_ALL}"
+    )
+
+    args = parser.parse_args()
+
+    num_phrases = args.phrases
+    words_per_phrase = args.words
+    output_file = args.output
+    compression = args.compress
+    show_progress = args.progress
+    metrics_out = args.metrics_out
+    dedup_index = args.dedup_index
+    output_format = args.output_format
+    mnemonic_phrase = args.mnemonic
+    password_length = args.password_length
+    use_symbols = args.use_symbols
+    workers = args.workers
+    scheme = args.scheme
+    batch_input = args.batch_input
+    ordered = not args.unordered
+    sites = list(args.site)
+    sites_file = args.sites_file
+    verify_checksum = not args.no_checksum
+    validate_file = args.validate
+    profile_file = args.profile
+
+    # Initialize colorama for cross-platform ANSI color support
+    init_colors()
+
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if metrics_out:
+        set_instrumentation(MetricsRecorder())
+
+    dedup = None
+    try:
+        if batch_input and mnemonic_phrase:
+            raise ValueError("Options --batch-input and --mnemonic cannot be used simultaneously.")
+        if (args.journal or args.shard) and not batch_input:
+            raise ValueError("Options --journal and --shard require --batch-input.")
+        shard = (1, 1)
+        if args.shard:
+            from .jobs import parse_shard
+            shard = parse_shard(args.shard)
+
+        # Passwords derived with a profile are only reproducible with the
+        # same iteration counts, so they are printed next to the results
+        profile = load_profile(profile_file) if profile_file and not args.calibrate else None
+        kdf_params = parse_kdf_params(args.kdf_param)  # Malformed values fail in every mode
+        if (args.kdf or kdf_params) and not args.calibrate:
+            base = profile or DEFAULT_PROFILE
+            if args.kdf:
+                profile = dict(base, kdf=args.kdf, kdf_params=kdf_params)
+            else:
+                # Parameters without --kdf tune the profile's backend (pbkdf2-sha512 by default)
+                profile = dict(base, kdf=base.get("kdf", DEFAULT_KDF), kdf_params=dict(base.get("kdf_params", {}), **kdf_params))
+            profile_kdf(profile)  # Fail early on unknown parameters
+        profile_note = f"# {describe_profile(profile)}\n" if profile else ""
+        # Machine-readable records always carry the work factor they were derived with
+        work_factor = describe_profile(profile or DEFAULT_PROFILE)
+
+        if args.calibrate:
+            # Benchmark the KDF on this host and record the tuned work factor
+            profile = calibrate_profile(args.target_ms, kdf=args.kdf or DEFAULT_KDF, kdf_params=kdf_params)
+            content = json.dumps(profile, indent=2) + "\n"
+            if profile_file:
+                with open(profile_file, "w") as file:
+                    file.write(content)
+                logging.info(f"{Fore.GREEN}Saved profile ({describe_profile(profile)}) to: {profile_file}{Style.RESET_ALL}")
+            else:
+                sys.stdout.write(content)
+
+        elif args.serve:
+            # Serve derivation requests until interrupted
+            # asyncio and the process pool are only imported for this mode
+            import asyncio
+            from .server import PasswordServer
+            server = PasswordServer(workers=workers, client_concurrency=args.client_concurrency, profile=profile,
+                                    verify_checksum=verify_checksum)
+            try:
+                asyncio.run(server.serve(socket_path=args.socket, host=args.host, port=args.port))
+            except (KeyboardInterrupt, asyncio.CancelledError):
+                logging.info(f"{Fore.GREEN}Server stopped.{Style.RESET_ALL}")
+
+        elif validate_file:
+            # Report invalid lines as "line_number<TAB>reason"; valid lines produce no output
+            formatter = RecordFormatter(output_format, ("line", "error"))
+            output = open_phrase_output(output_file, compression) if output_file else sys.stdout
+            invalid = 0
+            try:
+                output.write(formatter.header())
+                for line_number, reason in validate_mnemonic_file(validate_file, verify_checksum=verify_checksum):
+                    output.write(formatter.format({"line": line_number, "error": reason}))
+                    invalid += 1
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+            logging.info(f"{Fore.GREEN}Validated {validate_file}: {invalid} invalid lines.{Style.RESET_ALL}")
+
+        elif args.merge_journals:
+            # Combine shard journals into one output ordered by line number
+            from .jobs import merge_journals
+            job, results, incomplete = merge_journals(args.merge_journals)
+            formatter = RecordFormatter(output_format, ("line", "password", "length", "scheme", "work_factor", "error"),
+                                        text_fields=("line", "password"))
+            output = open_phrase_output(output_file, compression) if output_file else sys.stdout
+            derived = failed = 0
+            try:
+                output.write(formatter.header(f"# {job['work_factor']}\n"))
+                for line_number, password, error in results:
+                    if error:
+                        failed += 1
+                        logging.error(f"{Fore.RED}Line {line_number}: {error}{Style.RESET_ALL}")
+                        if formatter.is_text:
+                            continue
+                    else:
+                        derived += 1
+                    output.write(formatter.format({"line": line_number, "password": password, "length": job["password_length"],
+                                                   "scheme": job["scheme"], "work_factor": job["work_factor"], "error": error}))
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+            logging.info(f"{Fore.GREEN}Merged {derived} passwords from {len(args.merge_journals)} journals ({failed} failed).{Style.RESET_ALL}")
+            if incomplete:
+                logging.warning(f"{Fore.YELLOW}Shards missing or unfinished: {', '.join(incomplete)}{Style.RESET_ALL}")
+
+        elif batch_input and args.journal:
+            # Resumable job: results go to the journal as they finish and a
+            # rerun of the same command skips the lines already recorded
+            from .jobs import run_batch_job
+            derived, failed, skipped = run_batch_job(
+                batch_input, args.journal, shard=shard, password_length=password_length, use_symbols=use_symbols,
+                workers=workers, scheme=scheme, verify_checksum=verify_checksum, profile=profile,
+                checkpoint_interval=args.checkpoint_interval
+            )
+            logging.info(f"{Fore.GREEN}Job shard {shard[0]}/{shard[1]}: derived {derived} passwords ({failed} failed, "
+                         f"{skipped} already done). Journal: {args.journal}{Style.RESET_ALL}")
+
+        elif batch_input:
+            # Derive passwords for every mnemonic in the input file, streaming
+            # "line_number<TAB>password" records as they become available
+            from .batch import derive_passwords_in_batch, read_mnemonic_lines
+            from .jobs import shard_items
+            formatter = RecordFormatter(output_format, ("line", "phrase", "password", "length", "scheme", "timing",
+                                                        "work_factor", "error"), text_fields=("line", "password"))
+            output = open_phrase_output(output_file, compression) if output_file else sys.stdout
+            derived = failed = 0
+            try:
+                results = derive_passwords_in_batch(
+                    shard_items(read_mnemonic_lines(batch_input), shard), password_length=password_length,
+                    use_symbols=use_symbols, workers=workers, ordered=ordered, scheme=scheme,
+                    verify_checksum=verify_checksum, profile=profile, detailed=True
+                )
+                output.write(formatter.header(profile_note))
+                for line_number, phrase, password, error, seconds in results:
+                    if error:
+                        failed += 1
+                        get_instrumentation().count("password_errors")
+                        logging.error(f"{Fore.RED}Line {line_number}: {error}{Style.RESET_ALL}")
+                        if formatter.is_text:
+                            continue
+                    else:
+                        derived += 1
+                        # Derivations run in pool processes, so only the parent's counts reach the metrics
+                        get_instrumentation().count("passwords")
+                    output.write(formatter.format({"line": line_number, "phrase": phrase, "password": password,
+                                                   "length": password_length, "scheme": scheme, "timing": round(seconds, 6),
+                                                   "work_factor": work_factor, "error": error}))
+                    if formatter.is_text:
+                        # Interactive output shows every password as soon as it is ready
+                        output.flush()
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+            logging.info(f"{Fore.GREEN}Derived {derived} passwords from {batch_input} ({failed} failed).{Style.RESET_ALL}")
+            if output_file and output_file != "-":
+                logging.info(f"{Fore.GREEN}Saved to: {output_file}{Style.RESET_ALL}")
+
+        elif mnemonic_phrase and (sites or sites_file):
+            # Derive one password per site while computing the seed and
+            # stage-1 key only once
+            if sites_file:
+                with open(sites_file, "r") as file:
+                    sites.extend(line.strip() for line in file if line.strip())
+
+            formatter = RecordFormatter(output_format, ("site", "password", "length", "scheme", "timing", "work_factor"),
+                                        text_fields=("site", "password"))
+            output = open_phrase_output(output_file, compression) if output_file else sys.stdout
+            try:
+                with PasswordVault(mnemonic_phrase, verify_checksum=verify_checksum, profile=profile) as vault:
+                    results = vault.derive_many(sites, password_length=password_length, use_symbols=use_symbols,
+                                                workers=workers, scheme=scheme)
+                    output.write(formatter.header(profile_note))
+                    # Results arrive in input order, so timing is the wait for each one after the previous
+                    last_time = time.perf_counter()
+                    for site, password in results:
+                        now = time.perf_counter()
+                        output.write(formatter.format({"site": site, "password": password, "length": password_length,
+                                                       "scheme": scheme, "timing": round(now - last_time, 6),
+                                                       "work_factor": work_factor}))
+                        last_time = now
+                        if formatter.is_text:
+                            output.flush()
+            finally:
+                if output is not sys.stdout:
+                    output.close()
+            logging.info(f"{Fore.GREEN}Derived passwords for {len(sites)} sites.{Style.RESET_ALL}")
+            if output_file and output_file != "-":
+                logging.info(f"{Fore.GREEN}Saved to: {output_file}{Style.RESET_ALL}")
+
+        elif mnemonic_phrase:
+            # Generate password from provided mnemonic phrase
+            reason = check_mnemonic_phrase(mnemonic_phrase, verify_checksum=verify_checksum)
+            if reason is not None:
+                raise ValueError(reason)
+            formatter = RecordFormatter(output_format, ("phrase", "password", "length", "scheme", "timing", "work_factor"))
+            
+            if formatter.is_text:
+                # Attach to the package logger so derivation messages are shown too
+                logger = logging.getLogger("pypassgen")
+                logger.setLevel(logging.INFO)
+
+                # Create console handler and set formatter with color formatting
+                console_handler = logging.StreamHandler()
+                console_handler.setFormatter(logging.Formatter(Fore.CYAN + Style.BRIGHT + "[%(levelname)s] %(message)s"))
+                logger.addHandler(console_handler)
+
+                logger.info(Fore.YELLOW + f"Generating password from mnemonic phrase: '{mnemonic_phrase}'...")
+                logger.info(Fore.YELLOW + f"Desired password length: {password_length} characters.")
+            
+            start_time = time.perf_counter()
+            password = generate_password_from_mnemonic(mnemonic_phrase, password_length=password_length, use_symbols=use_symbols,
+                                                       workers=workers, scheme=scheme, verify_checksum=verify_checksum,
+                                                       profile=profile)
+            if formatter.is_text:
+                print("Generated Password:", password)
+                if profile:
+                    print("Work Factor:", describe_profile(profile))
+            else:
+                output = open_phrase_output(output_file, compression) if output_file else sys.stdout
+                try:
+                    output.write(formatter.header())
+                    output.write(formatter.format({"phrase": mnemonic_phrase, "password": password, "length": password_length,
+                                                   "scheme": scheme, "timing": round(time.perf_counter() - start_time, 6),
+                                                   "work_factor": work_factor}))
+                finally:
+                    if output is not sys.stdout:
+                        output.close()
+        
+        else:
+            if dedup_index:
+                from .dedup import PhraseIndex
+                dedup = PhraseIndex(dedup_index, words_per_phrase, capacity=args.dedup_capacity,
+                                    false_positive_rate=args.dedup_fp_rate)
+            # Generate mnemonic phrases lazily so that memory stays flat for any count
+            mnemonic_phrases = iter_mnemonic_phrases(num_phrases, words_per_phrase, dedup=dedup)
+            formatter = RecordFormatter(output_format, ("phrase",))
+
+            if output_file or not formatter.is_text:
+                # Write generated mnemonic phrases to the specified output file; records go to stdout by default
+                write_phrases_to_file(formatter.format_phrases(mnemonic_phrases), output_file or "-", compression=compression,
+                                      total=num_phrases, progress=show_progress)
+                logging.info(f"{Fore.GREEN}Generated {num_phrases} mnemonic phrases with {words_per_phrase} words per phrase.{Style.RESET_ALL}")
+                if output_file and output_file != "-":
+                    logging.info(f"{Fore.GREEN}Saved to: {output_file}{Style.RESET_ALL}")
+            else:
+                # Print generated mnemonic phrases to the console with custom coloring
+                for idx, phrase in enumerate(mnemonic_phrases):
+                    words = phrase.split()
+                    first_word = words[0]
+                    rest_of_phrase = " ".join(words[1:])
+
+                    # Determine colors for the first word and the rest of the phrase
+                    first_word_color = Fore.GREEN
+                    rest_color = Fore.MAGENTA if idx % 2 == 0 else Fore.CYAN
+
+                    # Print the first word in green and the rest of the phrase in alternating colors
+                    print(f"{first_word_color}{first_word}{Style.RESET_ALL} {rest_color}{rest_of_phrase}{Style.RESET_ALL}")
+
+    except ValueError as ve:
+        print(Fore.RED + f"ValueError: {ve}")
+    except Exception as e:
+        logging.exception(f"{Fore.RED}An error occurred: {e}{Style.RESET_ALL}")
+    finally:
+        if dedup is not None:
+            # Record the phrases issued so far, also when the run failed or was interrupted
+            from .dedup import describe_dedup_stats
+            dedup.close()
+            logging.info(f"{Fore.GREEN}{describe_dedup_stats(dedup.stats())}{Style.RESET_ALL}")
+        if metrics_out:
+            get_instrumentation().write(metrics_out)
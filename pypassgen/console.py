@@ -0,0 +1,34 @@
+_colors_enabled = True
+
+class _LazyColors:
+    # Stands in for colorama's Fore/Style and imports colorama on first use,
+    # so modes that never print colored text do not pay for the import
+    def __init__(self, name):
+        self._name = name
+
+    def __getattr__(self, attribute):
+        if not _colors_enabled:
+            return ""
+        import colorama
+        value = getattr(getattr(colorama, self._name), attribute)
+        setattr(self, attribute, value)
+        return value
+
+Fore = _LazyColors("Fore")
+Style = _LazyColors("Style")
+
+def disable_colors():
+    """Make Fore and Style produce empty strings, without ever importing colorama."""
+    global _colors_enabled
+    _colors_enabled = False
+    for colors in (Fore, Style):
+        name = colors._name
+        vars(colors).clear()
+        colors._name = name
+
+def init_colors():
+    """Initialize colorama for cross-platform colored output, unless colors are disabled."""
+    if not _colors_enabled:
+        return
+    import colorama
+    colorama.init(autoreset=True)
@@ -0,0 +1,277 @@
+import logging
+import math
+import os
+import struct
+
+from .console import Fore, Style
+from .metrics import get_instrumentation
+from .phrases import _load_numpy
+
+# Bloom filter file: magic, version, hash count, reserved, bit count,
+# capacity and items added, followed by the bit array
+FILTER_HEADER = struct.Struct("<8sBBHQQQ")
+FILTER_MAGIC = b"PPGBLOOM"
+# Index file: magic, version, record size, reserved and record count,
+# followed by the sorted entropy records
+INDEX_HEADER = struct.Struct("<8sBBHQ")
+INDEX_MAGIC = b"PPGINDEX"
+DEDUP_VERSION = 1
+
+# Records of the old index merged per step, so a merge needs little memory for any index size
+MERGE_BLOCK = 1 << 20
+
+def bloom_parameters(capacity, false_positive_rate):
+    """Return (bit count, hash count) of the smallest Bloom filter for capacity items at the given false-positive rate."""
+    if capacity < 1 or not 0 < false_positive_rate < 1:
+        raise ValueError("Dedup capacity must be positive and the false-positive rate between 0 and 1.")
+    bits = math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+    bits = max(64, (bits + 63) // 64 * 64)
+    return bits, max(1, round(bits / capacity * math.log(2)))
+
+class PhraseIndex:
+    """Persistent duplicate detection for generated phrase entropy.
+
+    An in-memory Bloom filter answers "never issued" for almost every new
+    record without touching the disk. Its rare hits are confirmed exactly
+    against a sorted on-disk index of every record accepted before (plus the
+    accepted records of this run that are not merged yet), so a phrase is
+    only rejected when it really was issued. Phrase entropy is uniformly
+    random, so the filter positions are taken from the record bytes instead
+    of hashing them.
+
+    ``directory`` holds one filter and one index per word count. Accepted
+    records are merged into the index every ``flush_records`` records and on
+    close; the filter is saved first, so it always covers the index. When
+    the index outgrows the capacity the filter is rebuilt twice as large.
+    Only one process may use a directory at a time.
+    """
+
+    def __init__(self, directory, words_per_phrase, capacity=10000000, false_positive_rate=0.001, flush_records=1000000):
+        self._np = np = _load_numpy()
+        if np is None:
+            raise ValueError("Deduplication requires the 'numpy' package (pip install numpy).")
+        os.makedirs(directory, exist_ok=True)
+        self.words_per_phrase = words_per_phrase
+        self.entropy_bytes = words_per_phrase * 4 // 3
+        self.false_positive_rate = false_positive_rate
+        self.flush_records = flush_records
+        self._dtype = np.dtype(f"S{self.entropy_bytes}")
+        self._filter_path = os.path.join(directory, f"words-{words_per_phrase}.bloom")
+        self._index_path = os.path.join(directory, f"words-{words_per_phrase}.idx")
+        self._pending = []
+        self._pending_count = 0
+        self.checked = self.duplicates = self.false_positives = 0
+        self.peak_memory = 0
+
+        self._open_index()
+        if os.path.exists(self._filter_path):
+            self._load_filter()
+        else:
+            self._create_filter(max(capacity, 2 * len(self._index)))
+            self._add_index_to_filter()
+        if self.items < len(self._index):
+            raise ValueError(f"{self._filter_path} does not cover {self._index_path}; delete the filter to rebuild it.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def _open_index(self):
+        np = self._np
+        self._index = np.empty(0, dtype=self._dtype)
+        if not os.path.exists(self._index_path):
+            return
+        with open(self._index_path, "rb") as file:
+            header = file.read(INDEX_HEADER.size)
+        if len(header) != INDEX_HEADER.size:
+            raise ValueError(f"{self._index_path} is not a dedup index.")
+        magic, version, record_size, _, count = INDEX_HEADER.unpack(header)
+        if magic != INDEX_MAGIC or version != DEDUP_VERSION or record_size != self.entropy_bytes:
+            raise ValueError(f"{self._index_path} is not a dedup index for {self.words_per_phrase}-word phrases.")
+        if os.path.getsize(self._index_path) != INDEX_HEADER.size + count * record_size:
+            raise ValueError(f"{self._index_path} is truncated or has trailing data.")
+        if count:
+            self._index = np.memmap(self._index_path, dtype=self._dtype, mode="r", offset=INDEX_HEADER.size, shape=(count,))
+
+    def _create_filter(self, capacity):
+        self.capacity = capacity
+        self._bit_count, self._hash_count = bloom_parameters(capacity, self.false_positive_rate)
+        self._bits = self._np.zeros(self._bit_count // 8, dtype=self._np.uint8)
+        self.items = 0
+
+    def _load_filter(self):
+        with open(self._filter_path, "rb") as file:
+            header = file.read(FILTER_HEADER.size)
+            if len(header) != FILTER_HEADER.size:
+                raise ValueError(f"{self._filter_path} is not a dedup filter.")
+            magic, version, self._hash_count, _, self._bit_count, self.capacity, self.items = FILTER_HEADER.unpack(header)
+            if magic != FILTER_MAGIC or version != DEDUP_VERSION:
+                raise ValueError(f"{self._filter_path} is not a dedup filter (or uses an unsupported version).")
+            self._bits = self._np.fromfile(file, dtype=self._np.uint8)
+        if len(self._bits) * 8 != self._bit_count:
+            raise ValueError(f"{self._filter_path} is truncated or has trailing data.")
+
+    def _save_filter(self):
+        temporary_path = self._filter_path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(FILTER_HEADER.pack(FILTER_MAGIC, DEDUP_VERSION, self._hash_count, 0, self._bit_count, self.capacity,
+                                          self.items))
+            file.write(self._bits.tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self._filter_path)
+
+    def _positions(self, records):
+        # Double hashing over the first 16 entropy bytes: bit i is h1 + i * h2 (mod m);
+        # h2 is made odd so that no record maps all of its bits to one position
+        np = self._np
+        raw = records.view(np.uint8).reshape(len(records), self.entropy_bytes)[:, :16]
+        h1 = raw[:, :8].copy().view("<u8")
+        h2 = raw[:, 8:].copy().view("<u8") | np.uint64(1)
+        return (h1 + h2 * np.arange(self._hash_count, dtype=np.uint64)) % np.uint64(self._bit_count)
+
+    def _test(self, positions):
+        np = self._np
+        return np.all((self._bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1, axis=1)
+
+    def _add(self, positions):
+        np = self._np
+        np.bitwise_or.at(self._bits, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+        self.items += len(positions)
+
+    def _add_index_to_filter(self):
+        for start in range(0, len(self._index), MERGE_BLOCK):
+            self._add(self._positions(self._np.asarray(self._index[start:start + MERGE_BLOCK])))
+
+    def _contains(self, sorted_records, records):
+        np = self._np
+        found = np.zeros(len(records), dtype=bool)
+        if len(sorted_records):
+            positions = np.searchsorted(sorted_records, records)
+            inside = positions < len(sorted_records)
+            found[inside] = sorted_records[positions[inside]] == records[inside]
+        return found
+
+    def _seen(self, records):
+        seen = self._contains(self._index, records)
+        for pending in self._pending:
+            seen |= self._contains(pending, records)
+        return seen
+
+    def filter(self, entropy):
+        """Return the entropy records not issued before (in an earlier run or earlier in this one), in their order."""
+        np = self._np
+        if len(entropy) % self.entropy_bytes:
+            raise ValueError(f"Entropy is not a whole number of {self.entropy_bytes}-byte records.")
+        with get_instrumentation().span("dedup"):
+            records = np.frombuffer(entropy, dtype=self._dtype)
+            positions = self._positions(records)
+            duplicate = np.zeros(len(records), dtype=bool)
+
+            candidates = np.flatnonzero(self._test(positions))
+            if len(candidates):
+                confirmed = self._seen(records[candidates])
+                duplicate[candidates[confirmed]] = True
+                self.false_positives += len(candidates) - int(confirmed.sum())
+                get_instrumentation().count("dedup_false_positives", len(candidates) - int(confirmed.sum()))
+
+            # Repeats within the chunk are not in the filter yet; keep the first occurrence
+            _, first = np.unique(records, return_index=True)
+            if len(first) != len(records):
+                repeated = np.ones(len(records), dtype=bool)
+                repeated[first] = False
+                duplicate |= repeated
+
+            keep = ~duplicate
+            accepted = records[keep]
+            self._add(positions[keep])
+            self._pending.append(np.sort(accepted))
+            self._pending_count += len(accepted)
+            self.peak_memory = max(self.peak_memory, self._bits.nbytes + self._pending_count * self.entropy_bytes)
+
+        rejected = len(records) - len(accepted)
+        self.checked += len(records)
+        self.duplicates += rejected
+        get_instrumentation().count("dedup_checked", len(records))
+        get_instrumentation().count("dedup_duplicates", rejected)
+        if self._pending_count >= self.flush_records:
+            self.flush()
+        return entropy if not rejected else accepted.tobytes()
+
+    def flush(self):
+        """Merge the records accepted so far into the on-disk index and save the filter."""
+        np = self._np
+        if not self._pending:
+            return
+        with get_instrumentation().span("dedup_flush"):
+            new = np.sort(np.concatenate(self._pending))
+            self._save_filter()
+            self._merge(new)
+            self._pending = []
+            self._pending_count = 0
+            if len(self._index) > self.capacity:
+                self._grow()
+
+    def _merge(self, new):
+        np = self._np
+        old = self._index
+        insert_at = np.searchsorted(old, new) if len(old) else np.zeros(len(new), dtype=np.intp)
+        temporary_path = self._index_path + ".tmp"
+        with open(temporary_path, "wb") as file:
+            file.write(INDEX_HEADER.pack(INDEX_MAGIC, DEDUP_VERSION, self.entropy_bytes, 0, len(old) + len(new)))
+            taken = 0
+            for start in range(0, len(old), MERGE_BLOCK):
+                end = min(start + MERGE_BLOCK, len(old))
+                until = int(np.searchsorted(insert_at, end))
+                file.write(np.sort(np.concatenate([old[start:end], new[taken:until]])).tobytes())
+                taken = until
+            file.write(new[taken:].tobytes())
+            file.flush()
+            os.fsync(file.fileno())
+        self._index = None
+        os.replace(temporary_path, self._index_path)
+        self._open_index()
+
+    def _grow(self):
+        capacity = self.capacity
+        while capacity < 2 * len(self._index):
+            capacity *= 2
+        self._create_filter(capacity)
+        self._add_index_to_filter()
+        self._save_filter()
+        logging.warning(f"{Fore.YELLOW}Dedup index holds {len(self._index)} phrases, more than its capacity; "
+                        f"rebuilt the Bloom filter for {capacity} ({self._bits.nbytes / (1 << 20):.1f} MiB).{Style.RESET_ALL}")
+
+    def expected_false_positive_rate(self):
+        """Return the filter's theoretical false-positive rate at its current fill."""
+        return (1 - math.exp(-self._hash_count * self.items / self._bit_count)) ** self._hash_count
+
+    def stats(self):
+        """Return the counters of this run and the filter's size and memory footprint."""
+        fresh = self.checked - self.duplicates
+        return {
+            "checked": self.checked,
+            "duplicates": self.duplicates,
+            "false_positives": self.false_positives,
+            "observed_false_positive_rate": self.false_positives / fresh if fresh else 0.0,
+            "expected_false_positive_rate": self.expected_false_positive_rate(),
+            "indexed": len(self._index) + self._pending_count,
+            "capacity": self.capacity,
+            "filter_bytes": int(self._bits.nbytes),
+            "memory_bytes": int(max(self.peak_memory, self._bits.nbytes)),
+        }
+
+    def close(self):
+        """Merge the pending records into the index and save the filter; stats() stays available."""
+        self.flush()
+
+def describe_dedup_stats(stats):
+    """Format PhraseIndex.stats() as one log line."""
+    return (f"Dedup checked {stats['checked']} phrases and rejected {stats['duplicates']} duplicates; "
+            f"{stats['false_positives']} Bloom false positives (observed rate {stats['observed_false_positive_rate']:.2e}, "
+            f"expected {stats['expected_false_positive_rate']:.2e}). Index holds {stats['indexed']} phrases "
+            f"(capacity {stats['capacity']}), filter {stats['filter_bytes'] / (1 << 20):.1f} MiB, "
+            f"peak memory {stats['memory_bytes'] / (1 << 20):.1f} MiB.")
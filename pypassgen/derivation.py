@@ -0,0 +1,324 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from .console import Fore
+from .kdf import DEFAULT_PROFILE, profile_kdf
+from .metrics import get_instrumentation
+from .wordlist import check_mnemonic_phrase
+
+# Versioned password derivation schemes. "legacy" runs one 1,000,000-round
+# PBKDF2 per character and stays the default so existing passwords remain
+# reproducible; "v2" spends the work factor once and expands it with SHAKE-256.
+PASSWORD_SCHEMES = ("legacy", "v2")
+
+def derive_character_digest(key, position, label=b"", iterations=1000000, kdf=None):
+    """Run the per-position derivation: PBKDF2-HMAC-SHA512 with 1,000,000 rounds unless another kdf is given."""
+    # A label (e.g. a site name) is prepended to the salt; without one the
+    # salt is just the position, as in the original scheme
+    salt = label + b":" + str(position).encode() if label else str(position).encode()
+    with get_instrumentation().span("character"):
+        if kdf is not None:
+            return kdf(key, salt)
+        return hashlib.pbkdf2_hmac('sha512', key, salt, iterations)
+
+def derive_character_index(key, position, charset_size, label=b"", iterations=1000000, kdf=None):
+    """Derive the character set index for the password character at the given position."""
+    return int.from_bytes(derive_character_digest(key, position, label, iterations, kdf), 'big') % charset_size
+
+class DerivationCache:
+    """Bounded LRU cache of raw per-position PBKDF2 outputs.
+
+    Position ``i`` of a legacy password depends only on the stage-1 key, the
+    label and ``i``, so a shorter password is a prefix of a longer one and
+    the character set only matters after derivation. Entries are keyed by a
+    fingerprint of the key instead of the key itself. The cache's own copy
+    of each digest is zeroed when it is evicted or cleared. Entries older than ``ttl`` seconds are
+    evicted by the next get or put, whatever key it is for.
+    """
+
+    def __init__(self, max_entries=4096, ttl=600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        # (expiry, key) in insertion order; every entry lives for the same
+        # ttl, so expired entries are always at the front
+        self._expiry = deque()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(key, work_factor=1000000):
+        """Return a short one-way fingerprint identifying a stage-1 key and work factor (iterations or KDF)."""
+        # Fed in pieces so that no concatenated copy of the key is created
+        fingerprint = hashlib.blake2b(digest_size=16, person=b'pypassgen-cache')
+        fingerprint.update(key)
+        fingerprint.update(str(work_factor).encode())
+        return fingerprint.digest()
+
+    def get(self, fingerprint, label, position):
+        """Return the cached digest for a position, or None on a miss."""
+        with self._lock:
+            self._sweep()
+            entry = self._entries.get((fingerprint, label, position))
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end((fingerprint, label, position))
+            self.hits += 1
+            return bytes(entry[1])
+
+    def put(self, fingerprint, label, position, digest):
+        """Store the digest for a position, evicting the least recently used entries if full."""
+        with self._lock:
+            self._sweep()
+            cache_key = (fingerprint, label, position)
+            if cache_key in self._entries:
+                self._discard(cache_key)
+            expires = time.monotonic() + self.ttl
+            self._entries[cache_key] = (expires, bytearray(digest))
+            self._expiry.append((expires, cache_key))
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self):
+        """Zero and drop every entry."""
+        with self._lock:
+            while self._entries:
+                self._discard(next(iter(self._entries)))
+            self._expiry.clear()
+
+    def stats(self):
+        """Return hit, miss and eviction (LRU and expiry) counters along with the current size."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions, "entries": len(self._entries)}
+
+    def _sweep(self):
+        # Zero expired entries on every access instead of waiting for their
+        # key to be looked up again or for LRU pressure
+        now = time.monotonic()
+        while self._expiry and self._expiry[0][0] < now:
+            expires, cache_key = self._expiry.popleft()
+            entry = self._entries.get(cache_key)
+            # Records of entries that were overwritten or evicted since are skipped
+            if entry is not None and entry[0] == expires:
+                self._discard(cache_key)
+                self.evictions += 1
+
+    def _discard(self, cache_key):
+        _, digest = self._entries.pop(cache_key)
+        wipe_buffer(digest)
+
+def derive_legacy_password(key, characters, password_length, workers=1, label=b"", cache=None, iterations=1000000,
+                           kdf=None):
+    """Derive a password with the legacy scheme: one 1,000,000-round PBKDF2 call (or one kdf call) per character."""
+    password = [None] * password_length
+    if cache is not None:
+        fingerprint = cache.fingerprint(key, kdf if kdf is not None else iterations)
+
+    missing = []
+    for position in range(password_length):
+        digest = cache.get(fingerprint, label, position) if cache is not None else None
+        if digest is None:
+            missing.append(position)
+        else:
+            password[position] = characters[int.from_bytes(digest, 'big') % len(characters)]
+
+    def store(position, digest):
+        # Each digest is reduced to its character and dropped right away,
+        # so at most a few digests are alive at any time
+        if cache is not None:
+            cache.put(fingerprint, label, position, digest)
+        password[position] = characters[int.from_bytes(digest, 'big') % len(characters)]
+
+    if workers == 0:
+        workers = os.cpu_count() or 1
+    if workers > 1 and len(missing) > 1:
+        # Every character depends only on the key and its position, so the
+        # derivations can run side by side. hashlib releases the GIL while
+        # running PBKDF2, which lets a thread pool use all requested cores.
+        logging.getLogger(__name__).info(Fore.GREEN + f"Deriving characters with {workers} workers...")
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Keep two tasks per worker in flight instead of queueing every
+            # position, so memory does not grow with the password length
+            pending = deque()
+            for position in missing:
+                pending.append((position, executor.submit(derive_character_digest, key, position, label, iterations, kdf)))
+                if len(pending) >= workers * 2:
+                    position, future = pending.popleft()
+                    store(position, future.result())
+            while pending:
+                position, future = pending.popleft()
+                store(position, future.result())
+    else:
+        for position in missing:
+            store(position, derive_character_digest(key, position, label, iterations, kdf))
+    return password
+
+def derive_v2_password(key, characters, password_length, label=b"", iterations=1000000, kdf=None):
+    """Derive a password with the v2 scheme: one expensive PBKDF2 (or kdf) call, then SHAKE-256 expansion."""
+    salt = b'pypassgen-v2:' + label if label else b'pypassgen-v2'
+    expander = hashlib.shake_256(b'pypassgen-v2-expand')
+    with get_instrumentation().span("v2_key"):
+        # The master key is hashlib output (immutable bytes that cannot be
+        # wiped); it is absorbed by the expander without further copies and
+        # dropped right away
+        expander.update(kdf(key, salt) if kdf is not None else hashlib.pbkdf2_hmac('sha512', key, salt, iterations))
+
+    # Bytes at or above the largest multiple of the alphabet size are rejected
+    # so that every character is equally likely
+    limit = 256 - (256 % len(characters))
+    password = []
+    offset = 0
+    stream_length = password_length * 2
+    while len(password) < password_length:
+        # SHAKE output is prefix-stable, so asking for a longer stream only
+        # appends bytes after the ones already consumed
+        stream = expander.digest(stream_length)
+        for byte in stream[offset:]:
+            if byte < limit:
+                password.append(characters[byte % len(characters)])
+                if len(password) == password_length:
+                    break
+        offset = stream_length
+        stream_length *= 2
+    return password
+
+def derive_stage1_key(mnemonic_phrase, verify_checksum=True, iterations=8192):
+    """Derive the BIP39 seed and the 8192-round PBKDF2-HMAC-SHA512 key shared by all schemes.
+
+    The key is returned as a bytearray that the caller owns and should zero
+    with wipe_buffer() when done. The seed and the raw hashlib outputs are
+    immutable bytes that cannot be wiped; they are only dropped promptly.
+    """
+    logger = logging.getLogger(__name__)
+
+    # Validate mnemonic phrase before spending any work on it
+    reason = check_mnemonic_phrase(mnemonic_phrase, verify_checksum=verify_checksum)
+    if reason is not None:
+        logger.error(Fore.RED + f"Invalid mnemonic phrase. {reason}")
+        raise ValueError(reason)
+
+    # Generate seed from mnemonic phrase using BIP39 seed derivation
+    logger.info(Fore.GREEN + "Generating seed from mnemonic phrase using BIP39...")
+    from mnemonic import Mnemonic  # Imported on first use to keep startup fast
+    with get_instrumentation().span("seed"):
+        seed = Mnemonic.to_seed(mnemonic_phrase)
+
+    # Use PBKDF2-HMAC-SHA512 to derive a secure key
+    logger.info(Fore.GREEN + "Deriving secure key using PBKDF2-HMAC-SHA512...")
+    with get_instrumentation().span("stage1_key"):
+        return bytearray(hashlib.pbkdf2_hmac('sha512', seed, b'password', iterations))
+
+def password_characters(use_symbols=True):
+    """Return the alphabet passwords are drawn from."""
+    characters = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789"
+    if use_symbols:
+        characters += "!@#$%^&*()_+-=[]{};:,.<>?~"
+    return characters
+
+def derive_password_from_key(key, password_length=12, use_symbols=True, workers=1, scheme="legacy", label=b"", cache=None,
+                             profile=None):
+    """Derive a password from an already computed stage-1 key."""
+    logger = logging.getLogger(__name__)
+    kdf = profile_kdf(profile)
+
+    if scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"Unknown password scheme '{scheme}'. Choose from: {', '.join(PASSWORD_SCHEMES)}.")
+
+    # Determine character set for password
+    characters = password_characters(use_symbols)
+
+    # Generate password using the selected derivation scheme
+    logger.info(Fore.GREEN + f"Generating password of length {password_length} characters with {kdf.name}...")
+    start_time = time.time()  # Start timing password generation
+    try:
+        with get_instrumentation().span("password"):
+            if scheme == "v2":
+                logger.info(Fore.GREEN + f"Expanding key with the v2 scheme ({kdf.name} + SHAKE-256)...")
+                password = derive_v2_password(key, characters, password_length, label=label, kdf=kdf)
+            else:
+                password = derive_legacy_password(key, characters, password_length, workers=workers, label=label, cache=cache,
+                                                  kdf=kdf)
+    except Exception as e:
+        get_instrumentation().count("password_errors")
+        logger.error(Fore.RED + f"Error generating password: {e}")
+        raise
+    get_instrumentation().count("passwords")
+
+    end_time = time.time()  # End timing password generation
+    logger.info(Fore.GREEN + f"Password generated successfully in {end_time - start_time:.6f} seconds.")
+    return ''.join(password)
+
+def generate_password_from_mnemonic(mnemonic_phrase, password_length=12, use_symbols=True, workers=1, scheme="legacy", cache=None,
+                                    verify_checksum=True, profile=None):
+    if scheme not in PASSWORD_SCHEMES:
+        raise ValueError(f"Unknown password scheme '{scheme}'. Choose from: {', '.join(PASSWORD_SCHEMES)}.")
+
+    profile = profile or DEFAULT_PROFILE
+    key = derive_stage1_key(mnemonic_phrase, verify_checksum=verify_checksum, iterations=profile["stage1_iterations"])
+    try:
+        return derive_password_from_key(key, password_length=password_length, use_symbols=use_symbols, workers=workers,
+                                        scheme=scheme, cache=cache, profile=profile)
+    finally:
+        wipe_buffer(key)
+
+def wipe_buffer(buffer):
+    """Overwrite a mutable buffer with zeros in place."""
+    buffer[:] = bytes(len(buffer))
+
+class PasswordVault:
+    """Derive per-site passwords from one mnemonic phrase.
+
+    The BIP39 seed and the stage-1 key are computed once; the key is kept
+    in a bytearray that is zeroed by close() or when leaving a ``with``
+    block.
+    Each site name is mixed into the salt of the per-site derivation.
+    """
+
+    def __init__(self, mnemonic_phrase, cache=None, verify_checksum=True, profile=None):
+        self._profile = profile or DEFAULT_PROFILE
+        self._key = derive_stage1_key(mnemonic_phrase, verify_checksum=verify_checksum,
+                                      iterations=self._profile["stage1_iterations"])
+        self._cache = cache
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Zero the stage-1 key; the vault cannot be used afterwards."""
+        if self._key is not None:
+            wipe_buffer(self._key)
+            self._key = None
+
+    def derive(self, site, password_length=12, use_symbols=True, workers=1, scheme="legacy"):
+        """Derive the password for a single site."""
+        if self._key is None:
+            raise ValueError("Password vault has been closed.")
+        label = site.strip().encode("utf-8")
+        if not label:
+            raise ValueError("Site name must not be empty.")
+        return derive_password_from_key(self._key, password_length=password_length, use_symbols=use_symbols,
+                                        workers=workers, scheme=scheme, label=label, cache=self._cache, profile=self._profile)
+
+    def derive_many(self, sites, password_length=12, use_symbols=True, workers=1, scheme="legacy"):
+        """Derive passwords for many sites, yielding (site, password) pairs in input order."""
+        sites = list(sites)
+        if workers == 0:
+            workers = os.cpu_count() or 1
+        task = partial(self.derive, password_length=password_length, use_symbols=use_symbols, scheme=scheme)
+        # Sites are spread over the thread pool; each site derives its
+        # characters serially so the pool is not oversubscribed
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            yield from zip(sites, executor.map(task, sites))
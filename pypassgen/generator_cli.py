@@ -0,0 +1,154 @@
+import argparse
+import logging
+
+from .console import Fore, Style, disable_colors, init_colors
+from .metrics import MetricsRecorder, get_instrumentation, set_instrumentation
+from .phrases import PackedPhraseReader, iter_mnemonic_phrases, write_packed_phrases, write_phrases_to_file
+from .records import OUTPUT_FORMATS, RecordFormatter, plain_output_requested
+
+def main():
+    if plain_output_requested():
+        # Machine-readable output is never colored, so colorama is not even imported
+        disable_colors()
+
+    parser = argparse.ArgumentParser(
+        description=f"{Fore.CYAN}Generate BIP 39 compatible mnemonic phrases and save to a file.{Style.RESET_ALL}",
+        usage=f"{Fore.GREEN}%(prog)s [-p N] [-w {{12,15,18,21,24}}] [-o FILE|-] [--compress {{gzip,zstd}}] [--progress] [--metrics-out FILE] [--output-format {{text,jsonl,csv}}] [--dedup-index DIR [--dedup-capacity N] [--dedup-fp-rate P]] [--format {{text,bin}}] [--decode FILE [--record N]]{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "-p", "--phrases", type=int, default=1,
+        help=f"{Fore.YELLOW}Number of mnemonic phrases to generate (default: 1){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "-w", "--words", type=int, default=12, choices=[12, 15, 18, 21, 24],
+        help=f"{Fore.YELLOW}Number of words per phrase (choices: 12, 15, 18, 21, 24; default: 12){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "-o", "--output", type=str, default=None,
+        help=f"{Fore.YELLOW}Output file to save generated phrases ('-' for stdout; .gz/.zst names are compressed){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--compress", type=str, default=None, choices=["gzip", "zstd"],
+        help=f"{Fore.YELLOW}Compress the output file (default: detected from the file extension){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--progress", action='store_true',
+        help=f"{Fore.YELLOW}Log progress while writing phrases to the output file{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--metrics-out", type=str, default=None,
+        help=f"{Fore.YELLOW}Collect timing and count metrics and write them to this file at exit (.json/.jsonl for JSON lines, Prometheus text otherwise){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--output-format", type=str, default="text", choices=OUTPUT_FORMATS,
+        help=f"{Fore.YELLOW}Format of the phrase output: colored text, or uncolored JSON lines or CSV records for other tools (default: text){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--dedup-index", type=str, default=None, metavar="DIR",
+        help=f"{Fore.YELLOW}Never issue a phrase twice: check generated phrases against this persistent index (created if missing) and add them to it{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--dedup-capacity", type=int, default=10000000,
+        help=f"{Fore.YELLOW}Phrases the Bloom filter of a new --dedup-index is sized for; it is rebuilt larger when exceeded (default: 10000000){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--dedup-fp-rate", type=float, default=0.001,
+        help=f"{Fore.YELLOW}Bloom filter false-positive rate of a new --dedup-index (default: 0.001){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--format", type=str, default="text", choices=["text", "bin"],
+        help=f"{Fore.YELLOW}Output file format: one phrase per line, or packed entropy records (default: text){Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--decode", type=str, default=None,
+        help=f"{Fore.YELLOW}Read phrases back from a packed (--format bin) file instead of generating new ones{Style.RESET_ALL}"
+    )
+    parser.add_argument(
+        "--record", type=int, default=None,
+        help=f"{Fore.YELLOW}With --decode, only output the phrase stored at this record index{Style.RESET_ALL}"
+    )
+    
+    args = parser.parse_args()
+    
+    num_phrases = args.phrases
+    words_per_phrase = args.words
+    output_file = args.output
+    compression = args.compress
+    show_progress = args.progress
+    metrics_out = args.metrics_out
+    dedup_index = args.dedup_index
+    record_format = args.output_format
+    output_format = args.format
+    decode_file = args.decode
+    record = args.record
+    
+    # Initialize colorama for cross-platform ANSI color support
+    init_colors()
+    
+    # Configure logging
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    if metrics_out:
+        set_instrumentation(MetricsRecorder())
+    
+    reader = None
+    dedup = None
+    try:
+        if decode_file:
+            # Decode phrases from a packed file; records are read on demand from the memory map
+            reader = PackedPhraseReader(decode_file)
+            mnemonic_phrases = [reader[record]] if record is not None else iter(reader)
+            num_phrases = 1 if record is not None else len(reader)
+            words_per_phrase = reader.words_per_phrase
+        else:
+            if dedup_index:
+                from .dedup import PhraseIndex
+                dedup = PhraseIndex(dedup_index, words_per_phrase, capacity=args.dedup_capacity,
+                                    false_positive_rate=args.dedup_fp_rate)
+            # Generate mnemonic phrases lazily so that memory stays flat for any count
+            mnemonic_phrases = iter_mnemonic_phrases(num_phrases, words_per_phrase, dedup=dedup)
+
+        formatter = RecordFormatter(record_format, ("phrase",))
+        if output_format == "bin" and not decode_file:
+            if not output_file:
+                raise ValueError("The binary format requires an output file (-o FILE).")
+            if not formatter.is_text:
+                raise ValueError("--output-format applies to text output, not to --format bin.")
+            write_packed_phrases(num_phrases, words_per_phrase, output_file, dedup=dedup)
+            logging.info(f"{Fore.GREEN}Generated {num_phrases} packed mnemonic phrases with {words_per_phrase} words per phrase.{Style.RESET_ALL}")
+            logging.info(f"{Fore.GREEN}Saved to: {output_file}{Style.RESET_ALL}")
+        elif output_file or not formatter.is_text:
+            # Write generated mnemonic phrases to the specified output file; records go to stdout by default
+            write_phrases_to_file(formatter.format_phrases(mnemonic_phrases), output_file or "-", compression=compression,
+                                  total=num_phrases, progress=show_progress)
+            action = "Decoded" if decode_file else "Generated"
+            logging.info(f"{Fore.GREEN}{action} {num_phrases} mnemonic phrases with {words_per_phrase} words per phrase.{Style.RESET_ALL}")
+            if output_file and output_file != "-":
+                logging.info(f"{Fore.GREEN}Saved to: {output_file}{Style.RESET_ALL}")
+        else:
+            # Print generated mnemonic phrases to the console with custom coloring
+            for idx, phrase in enumerate(mnemonic_phrases):
+                words = phrase.split()
+                first_word = words[0]
+                rest_of_phrase = " ".join(words[1:])
+                
+                # Determine colors for the first word and the rest of the phrase
+                first_word_color = Fore.GREEN
+                rest_color = Fore.MAGENTA if idx % 2 == 0 else Fore.CYAN
+                
+                # Print the first word in green and the rest of the phrase in alternating colors
+                print(f"{first_word_color}{first_word}{Style.RESET_ALL} {rest_color}{rest_of_phrase}{Style.RESET_ALL}")
+    except (ValueError, IndexError) as e:
+        print(Fore.RED + f"{type(e).__name__}: {e}")
+    except Exception as e:
+        logging.exception(f"{Fore.RED}An error occurred: {e}{Style.RESET_ALL}")
+    finally:
+        if reader is not None:
+            reader.close()
+        if dedup is not None:
+            # Record the phrases issued so far, also when the run failed or was interrupted
+            from .dedup import describe_dedup_stats
+            dedup.close()
+            logging.info(f"{Fore.GREEN}{describe_dedup_stats(dedup.stats())}{Style.RESET_ALL}")
+        if metrics_out:
+            get_instrumentation().write(metrics_out)
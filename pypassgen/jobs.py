@@ -0,0 +1,231 @@
+import hashlib
+import json
+import logging
+import os
+import time
+
+from .batch import derive_passwords_in_batch, read_mnemonic_lines
+from .console import Fore, Style
+from .kdf import DEFAULT_PROFILE, describe_profile
+
+def parse_shard(value):
+    """Parse a 'K/N' shard specification into (k, n) with 1 <= k <= n."""
+    k, separator, n = value.partition("/")
+    if not separator or not k.isdigit() or not n.isdigit() or not 1 <= int(k) <= int(n):
+        raise ValueError(f"Shard '{value}' must look like K/N with 1 <= K <= N.")
+    return int(k), int(n)
+
+def shard_items(items, shard):
+    """Keep the (line_number, mnemonic_phrase) items of shard (k, n); every line belongs to exactly one shard."""
+    k, n = shard
+    # Assigning by line number needs no coordination: every node reading the
+    # same input file agrees on which lines are its own
+    return (item for item in items if (item[0] - 1) % n == k - 1)
+
+def describe_job(input_file, shard=(1, 1), password_length=12, use_symbols=True, scheme="legacy", verify_checksum=True,
+                 profile=None):
+    """Return the parameters identifying a batch job; a journal can only be resumed or merged by the same job."""
+    digest = hashlib.sha256()
+    with open(input_file, "rb") as file:
+        for block in iter(lambda: file.read(1 << 20), b""):
+            digest.update(block)
+    return {
+        "input_sha256": digest.hexdigest(),
+        "items": sum(1 for _ in shard_items(read_mnemonic_lines(input_file), shard)),
+        "shard": list(shard),
+        "password_length": password_length,
+        "use_symbols": use_symbols,
+        "scheme": scheme,
+        "verify_checksum": verify_checksum,
+        "work_factor": describe_profile(profile or DEFAULT_PROFILE),
+    }
+
+def to_ranges(numbers):
+    """Compress a set of integers into sorted inclusive [start, end] ranges."""
+    ranges = []
+    for number in sorted(numbers):
+        if ranges and ranges[-1][1] == number - 1:
+            ranges[-1][1] = number
+        else:
+            ranges.append([number, number])
+    return ranges
+
+def from_ranges(ranges):
+    """Expand inclusive [start, end] ranges back into a set of integers."""
+    return {number for start, end in ranges for number in range(start, end + 1)}
+
+def read_journal(path):
+    """Return (job, records, offset) for a journal; a record cut short by a crash ends the read at offset."""
+    records = []
+    with open(path, "rb") as file:
+        header = file.readline()
+        try:
+            job = json.loads(header)["job"]
+        except (ValueError, KeyError):
+            raise ValueError(f"{path} is not a job journal.")
+        offset = len(header)
+        for line in file:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                break
+            offset += len(line)
+    return job, records, offset
+
+class JobJournal:
+    """Append-only JSON-lines journal of batch results with a checkpoint of the completed lines.
+
+    The first line describes the job and every following line is one
+    result. ``PATH.checkpoint`` stores the completed line numbers as ranges
+    together with the journal offset they cover, so a resumed job only reads
+    the records appended after the last checkpoint. A record cut short by a
+    crash is truncated when the journal is reopened.
+    """
+
+    def __init__(self, path, job, checkpoint_interval=10.0):
+        self.path = path
+        self.checkpoint_path = path + ".checkpoint"
+        self.job = job
+        self.checkpoint_interval = checkpoint_interval
+        self.completed = set()
+        self._file = None
+        self._last_checkpoint = time.monotonic()
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
+
+    def open(self):
+        """Create the journal, or resume an existing one after checking that it belongs to the same job."""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            self._file = open(self.path, "wb")
+            self._file.write((json.dumps({"job": self.job}) + "\n").encode())
+            self.checkpoint()
+            return
+
+        offset = self._resume()
+        # Drop a partial record left by a crash before appending again
+        os.truncate(self.path, offset)
+        self._file = open(self.path, "ab")
+
+    def _resume(self):
+        with open(self.path, "rb") as file:
+            header = file.readline()
+            if json.loads(header).get("job") != self.job:
+                raise ValueError(f"Journal {self.path} belongs to a different job (input, shard or settings changed).")
+            offset = len(header)
+
+            checkpoint = None
+            if os.path.exists(self.checkpoint_path):
+                with open(self.checkpoint_path, "r") as checkpoint_file:
+                    checkpoint = json.load(checkpoint_file)
+            if checkpoint and offset <= checkpoint["offset"] <= os.path.getsize(self.path):
+                self.completed = from_ranges(checkpoint["completed"])
+                offset = checkpoint["offset"]
+                file.seek(offset)
+
+            # Records written after the last checkpoint are still complete
+            for line in file:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    self.completed.add(json.loads(line)["line"])
+                except (ValueError, KeyError):
+                    break
+                offset += len(line)
+        return offset
+
+    def record(self, line_number, password, error=None):
+        """Append one result and checkpoint if the interval has passed."""
+        record = {"line": line_number, "error": error} if error else {"line": line_number, "password": password}
+        self._file.write((json.dumps(record) + "\n").encode())
+        self._file.flush()
+        self.completed.add(line_number)
+        if time.monotonic() - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint()
+
+    def checkpoint(self):
+        """Sync the journal and atomically replace the checkpoint with the current completed set."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        temporary_path = self.checkpoint_path + ".tmp"
+        with open(temporary_path, "w") as file:
+            json.dump({"offset": self._file.tell(), "completed": to_ranges(self.completed)}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(temporary_path, self.checkpoint_path)
+        self._last_checkpoint = time.monotonic()
+
+    def close(self):
+        """Write a final checkpoint and close the journal."""
+        if self._file is not None:
+            self.checkpoint()
+            self._file.close()
+            self._file = None
+
+def run_batch_job(input_file, journal_path, shard=(1, 1), password_length=12, use_symbols=True, workers=0, scheme="legacy",
+                  verify_checksum=True, profile=None, checkpoint_interval=10.0):
+    """Derive the passwords of one shard of an input file into a resumable journal.
+
+    Lines already in the journal are skipped, so the same command can be
+    rerun after a crash or interruption until every line of the shard is
+    done. Returns (derived, failed, skipped) counts for this run.
+    """
+    logger = logging.getLogger(__name__)
+    job = describe_job(input_file, shard=shard, password_length=password_length, use_symbols=use_symbols, scheme=scheme,
+                       verify_checksum=verify_checksum, profile=profile)
+    derived = failed = 0
+
+    with JobJournal(journal_path, job, checkpoint_interval=checkpoint_interval) as journal:
+        skipped = len(journal.completed)
+        if skipped:
+            logger.info(Fore.GREEN + f"Resuming {journal_path}: {skipped} of {job['items']} lines already done.")
+        items = (item for item in shard_items(read_mnemonic_lines(input_file), shard) if item[0] not in journal.completed)
+
+        # The journal is merged by line number later, so results are
+        # recorded in completion order to keep every worker busy
+        results = derive_passwords_in_batch(items, password_length=password_length, use_symbols=use_symbols, workers=workers,
+                                            ordered=False, scheme=scheme, verify_checksum=verify_checksum, profile=profile)
+        for line_number, password, error in results:
+            journal.record(line_number, password, error)
+            if error:
+                failed += 1
+                logger.error(f"{Fore.RED}Line {line_number}: {error}{Style.RESET_ALL}")
+            else:
+                derived += 1
+    return derived, failed, skipped
+
+def merge_journals(paths):
+    """Combine the journals of one job's shards.
+
+    Returns (job, results, incomplete) where results is a list of
+    (line_number, password, error) sorted by line number and incomplete
+    lists the shards that are missing or not finished yet.
+    """
+    jobs = []
+    results = {}
+    for path in paths:
+        job, records, _ = read_journal(path)
+        jobs.append(job)
+        for record in records:
+            results[record["line"]] = (record.get("password"), record.get("error"))
+        job["done"] = len(records)
+
+    def settings(job):
+        return {name: value for name, value in job.items() if name not in ("shard", "items", "done")}
+
+    for path, job in zip(paths, jobs):
+        if settings(job) != settings(jobs[0]) or job["shard"][1] != jobs[0]["shard"][1]:
+            raise ValueError(f"Journal {path} belongs to a different job than {paths[0]}.")
+
+    shard_count = jobs[0]["shard"][1]
+    finished = {job["shard"][0] for job in jobs if job["done"] >= job["items"]}
+    incomplete = [f"{k}/{shard_count}" for k in range(1, shard_count + 1) if k not in finished]
+    merged = [(line_number, password, error) for line_number, (password, error) in sorted(results.items())]
+    return settings(jobs[0]), merged, incomplete
@@ -0,0 +1,164 @@
+import hashlib
+import json
+import math
+import os
+import platform
+import time
+from functools import partial
+
+# Work factors used when no profile is given. Changing them changes every
+# derived password, so calibrated values are kept in a profile file instead.
+# The 2048 rounds of the BIP39 seed are fixed by the standard.
+DEFAULT_PROFILE = {"stage1_iterations": 8192, "character_iterations": 1000000}
+
+def kdf_pbkdf2_sha512(password, salt, iterations=1000000):
+    """PBKDF2-HMAC-SHA512, the backend every existing password was derived with."""
+    return hashlib.pbkdf2_hmac('sha512', password, salt, iterations)
+
+def kdf_pbkdf2_sha256(password, salt, iterations=1000000):
+    """PBKDF2-HMAC-SHA256 stretched to a 64-byte output."""
+    return hashlib.pbkdf2_hmac('sha256', password, salt, iterations, dklen=64)
+
+def kdf_scrypt(password, salt, n=16384, r=8, p=1, maxmem=0):
+    """Memory-hard scrypt; maxmem=0 allows exactly the memory n, r and p need."""
+    if not maxmem:
+        # OpenSSL needs 128*r*(n+p+2) bytes; leave some headroom above that
+        maxmem = 128 * r * (n + p + 2) + (1 << 20)
+    return hashlib.scrypt(password, salt=salt, n=n, r=r, p=p, maxmem=maxmem, dklen=64)
+
+def kdf_blake2b(password, salt, iterations=1000000):
+    """Iterated keyed BLAKE2b: each round hashes the previous digest under the key."""
+    if len(password) > 64:
+        password = hashlib.blake2b(password).digest()
+    keyed = hashlib.blake2b(key=password, person=b'pypassgen-kdf')
+    # The loop runs in Python and holds the GIL, so unlike the other
+    # backends it does not speed up with more worker threads
+    digest = salt
+    for _ in range(iterations):
+        state = keyed.copy()
+        state.update(digest)
+        digest = state.digest()
+    return digest
+
+# Registered key derivation backends and their default parameters. The
+# selected backend and its parameters are stored in the profile so that
+# passwords can be derived again with the same settings.
+KDF_BACKENDS = {
+    "pbkdf2-sha512": (kdf_pbkdf2_sha512, {"iterations": 1000000}),
+    "pbkdf2-sha256": (kdf_pbkdf2_sha256, {"iterations": 1000000}),
+    "scrypt": (kdf_scrypt, {"n": 16384, "r": 8, "p": 1, "maxmem": 0}),
+    "blake2b": (kdf_blake2b, {"iterations": 1000000}),
+}
+DEFAULT_KDF = "pbkdf2-sha512"
+
+class KeyDerivation:
+    """A registered KDF backend bound to its parameters, called as ``kdf(password, salt)``."""
+
+    def __init__(self, name=DEFAULT_KDF, **params):
+        if name not in KDF_BACKENDS:
+            raise ValueError(f"Unknown KDF '{name}'. Choose from: {', '.join(KDF_BACKENDS)}.")
+        function, defaults = KDF_BACKENDS[name]
+        unknown = set(params) - set(defaults)
+        if unknown:
+            raise ValueError(f"Unknown parameter(s) for KDF '{name}': {', '.join(sorted(unknown))}.")
+        self.name = name
+        self.params = {**defaults, **params}
+        for param, value in self.params.items():
+            if not isinstance(value, int) or value < 0 or (value == 0 and param != "maxmem"):
+                raise ValueError(f"KDF parameter '{param}' must be a positive integer.")
+        if name == "scrypt" and self.params["n"] & (self.params["n"] - 1):
+            raise ValueError("scrypt parameter 'n' must be a power of two.")
+        self._derive = partial(function, **self.params)
+
+    def __call__(self, password, salt):
+        return self._derive(password, salt)
+
+    def __str__(self):
+        return " ".join([f"kdf={self.name}"] + [f"{param}={value}" for param, value in self.params.items()])
+
+def profile_kdf(profile):
+    """Return the KeyDerivation a profile selects for the expensive per-password step."""
+    profile = profile or DEFAULT_PROFILE
+    name = profile.get("kdf", DEFAULT_KDF)
+    params = dict(profile.get("kdf_params", {}))
+    # Iteration based backends take their count from the profile unless it is given explicitly
+    if "iterations" in KDF_BACKENDS.get(name, (None, {}))[1]:
+        params.setdefault("iterations", profile["character_iterations"])
+    return KeyDerivation(name, **params)
+
+def parse_kdf_params(values):
+    """Turn KEY=VALUE strings from the command line into a parameter dict."""
+    params = {}
+    for value in values or ():
+        param, separator, number = value.partition("=")
+        if not separator or not number.isdigit():
+            raise ValueError(f"KDF parameter '{value}' must look like NAME=INTEGER.")
+        params[param] = int(number)
+    return params
+
+def load_profile(profile_file):
+    """Load a work factor profile written by --calibrate, filling in defaults for missing values."""
+    with open(profile_file, "r") as file:
+        data = json.load(file)
+    profile = dict(DEFAULT_PROFILE)
+    for name in DEFAULT_PROFILE:
+        if name in data:
+            if not isinstance(data[name], int) or data[name] < 1:
+                raise ValueError(f"Profile value '{name}' must be a positive integer.")
+            profile[name] = data[name]
+    if "kdf" in data:
+        profile["kdf"] = data["kdf"]
+        profile["kdf_params"] = dict(data.get("kdf_params", {}))
+        profile_kdf(profile)  # Fail early on unknown backends or parameters
+    return profile
+
+def calibrate_profile(target_ms, kdf=DEFAULT_KDF, kdf_params=None):
+    """Measure the chosen KDF on this host and return a profile whose per-character cost is about target_ms."""
+    if target_ms <= 0:
+        raise ValueError("Target latency must be positive.")
+
+    params = dict(kdf_params or {})
+    defaults = KDF_BACKENDS[kdf][1] if kdf in KDF_BACKENDS else {}
+    cost = "n" if kdf == "scrypt" else "iterations"
+    sample = {"n": 1024, "iterations": 100000 if kdf != "blake2b" else 10000}[cost]
+    params[cost] = sample
+    sample_kdf = KeyDerivation(kdf, **params)
+
+    # Take the best of a few runs to reduce noise from other processes
+    elapsed = min(
+        time_kdf(sample_kdf)
+        for _ in range(3)
+    )
+    per_second = sample / elapsed
+    if cost == "n":
+        # scrypt cost grows linearly with n, which must be a power of two
+        params["n"] = max(2, 1 << round(math.log2(max(per_second * target_ms / 1000, 2))))
+    else:
+        # Round to a multiple of 1000 so profiles are easy to read and compare
+        params["iterations"] = max(1000, round(per_second * target_ms / 1000 / 1000) * 1000)
+
+    profile = dict(DEFAULT_PROFILE)
+    if cost == "iterations":
+        profile["character_iterations"] = params.pop("iterations")
+    if kdf != DEFAULT_KDF or params:
+        profile["kdf"] = kdf
+        profile["kdf_params"] = {param: value for param, value in params.items() if value != defaults.get(param)}
+    profile["calibration"] = {
+        "target_ms": target_ms,
+        f"{cost}_per_second": round(per_second),
+        "host": platform.node(),
+        "machine": platform.machine(),
+        "python": platform.python_version(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+    return profile
+
+def time_kdf(kdf):
+    """Return the seconds one call of a KeyDerivation takes."""
+    start = time.perf_counter()
+    kdf(os.urandom(64), b'0')
+    return time.perf_counter() - start
+
+def describe_profile(profile):
+    """Return the KDF settings of a profile as text to be stored next to derived passwords."""
+    return f"stage1_iterations={profile['stage1_iterations']} {profile_kdf(profile)}"
@@ -0,0 +1,124 @@
+import json
+import threading
+import time
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+_NULL_SPAN = _NullSpan()
+
+class NullInstrumentation:
+    """Instrumentation that records nothing. This is the default, so uninstrumented runs pay no cost."""
+
+    def span(self, name):
+        return _NULL_SPAN
+
+    def count(self, name, value=1):
+        pass
+
+    def observe(self, name, value):
+        pass
+
+class _Span:
+    __slots__ = ("_recorder", "_name", "_start")
+
+    def __init__(self, recorder, name):
+        self._recorder = recorder
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._recorder.observe(f"{self._name}_seconds", time.perf_counter() - self._start)
+        return False
+
+class MetricsRecorder:
+    """Collect counters and latency histograms from named spans, and export them.
+
+    A span named ``seed`` feeds the ``seed_seconds`` histogram. Counters and
+    histograms can be written as a Prometheus text-format file or as JSON
+    lines, picked from the file extension in write().
+    """
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+    def __init__(self, prefix="pypassgen"):
+        self.prefix = prefix
+        self.counters = {}
+        self.histograms = {}
+        self._lock = threading.Lock()
+
+    def span(self, name):
+        return _Span(self, name)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name, value):
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = {"buckets": [0] * len(self.BUCKETS), "count": 0, "sum": 0.0}
+            for position, bound in enumerate(self.BUCKETS):
+                if value <= bound:
+                    histogram["buckets"][position] += 1
+            histogram["count"] += 1
+            histogram["sum"] += value
+
+    def to_prometheus(self):
+        """Render the collected metrics in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                metric = f"{self.prefix}_{name}_total"
+                lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+            for name, histogram in sorted(self.histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                lines.append(f"# TYPE {metric} histogram")
+                for bound, bucket_count in zip(self.BUCKETS, histogram["buckets"]):
+                    lines.append(f'{metric}_bucket{{le="{bound}"}} {bucket_count}')
+                lines += [
+                    f'{metric}_bucket{{le="+Inf"}} {histogram["count"]}',
+                    f"{metric}_sum {histogram['sum']}",
+                    f"{metric}_count {histogram['count']}",
+                ]
+        return "\n".join(lines) + "\n"
+
+    def to_json_lines(self):
+        """Render one JSON object per counter and histogram."""
+        timestamp = time.time()
+        records = []
+        with self._lock:
+            for name, value in sorted(self.counters.items()):
+                records.append({"type": "counter", "name": name, "value": value, "timestamp": timestamp})
+            for name, histogram in sorted(self.histograms.items()):
+                records.append({
+                    "type": "histogram", "name": name, "count": histogram["count"], "sum": histogram["sum"],
+                    "buckets": dict(zip(map(str, self.BUCKETS), histogram["buckets"])), "timestamp": timestamp,
+                })
+        return "".join(json.dumps(record) + "\n" for record in records)
+
+    def write(self, path):
+        """Write the metrics to path: JSON lines for .json/.jsonl files, Prometheus text otherwise."""
+        content = self.to_json_lines() if path.endswith((".json", ".jsonl")) else self.to_prometheus()
+        with open(path, "w") as file:
+            file.write(content)
+
+_instrumentation = NullInstrumentation()
+
+def get_instrumentation():
+    """Return the instrumentation used by the derivation and generation code."""
+    return _instrumentation
+
+def set_instrumentation(instrumentation):
+    """Install an instrumentation object (e.g. a MetricsRecorder) and return the previous one."""
+    global _instrumentation
+    previous, _instrumentation = _instrumentation, instrumentation
+    return previous
@@ -0,0 +1,254 @@
+import gzip
+import hashlib
+import io
+import logging
+import mmap
+import os
+import struct
+import sys
+import time
+
+from .metrics import get_instrumentation
+from .wordlist import VALID_WORD_COUNTS, load_wordlist
+
+# Packed binary format: magic, version, words per phrase, wordlist id,
+# reserved byte and record count, followed by fixed-size entropy records
+PACKED_HEADER = struct.Struct("<8sBBBBQ")
+PACKED_MAGIC = b"PPGMNEMO"
+PACKED_VERSION = 1
+PACKED_WORDLIST_ENGLISH = 0
+
+_numpy = None
+
+def _load_numpy():
+    # NumPy is optional and slow to import, so it is only loaded once phrases
+    # are generated; word indexes are split in pure Python without it
+    global _numpy
+    if _numpy is None:
+        try:
+            import numpy
+        except ImportError:
+            numpy = False
+        _numpy = numpy
+    return _numpy or None
+
+def _split_word_indexes(entropy, num_phrases, words_per_phrase):
+    # Each phrase is its entropy followed by the first ENT/32 bits of its
+    # SHA-256 checksum, read as consecutive 11-bit word indexes
+    entropy_bytes = words_per_phrase * 4 // 3
+    checksum_bits = entropy_bytes // 4
+    checksums = bytes(
+        hashlib.sha256(entropy[offset:offset + entropy_bytes]).digest()[0]
+        for offset in range(0, num_phrases * entropy_bytes, entropy_bytes)
+    )
+
+    np = _load_numpy()
+    if np is not None:
+        records = np.frombuffer(entropy, dtype=np.uint8).reshape(num_phrases, entropy_bytes)
+        records = np.hstack([records, np.frombuffer(checksums, dtype=np.uint8).reshape(num_phrases, 1)])
+        bits = np.unpackbits(records, axis=1)[:, :words_per_phrase * 11].reshape(num_phrases, words_per_phrase, 11)
+        weights = 1 << np.arange(10, -1, -1, dtype=np.uint16)
+        return (bits.astype(np.uint16) @ weights).tolist()
+
+    shift = 8 - checksum_bits
+    indexes = []
+    for phrase_number in range(num_phrases):
+        offset = phrase_number * entropy_bytes
+        value = (int.from_bytes(entropy[offset:offset + entropy_bytes], 'big') << checksum_bits) | (checksums[phrase_number] >> shift)
+        indexes.append([(value >> (11 * position)) & 2047 for position in range(words_per_phrase - 1, -1, -1)])
+    return indexes
+
+def entropy_to_phrases(entropy, words_per_phrase):
+    """Convert concatenated fixed-size entropy records into BIP39 phrases."""
+    wordlist = load_wordlist()
+    num_phrases = len(entropy) // (words_per_phrase * 4 // 3)
+    return [
+        " ".join([wordlist[index] for index in indexes])
+        for indexes in _split_word_indexes(entropy, num_phrases, words_per_phrase)
+    ]
+
+def _draw_entropy(num_phrases, entropy_bytes, dedup=None):
+    # Records rejected by the dedup stage are replaced by fresh ones until the
+    # batch is full; the replacements are checked like any other record
+    entropy = os.urandom(num_phrases * entropy_bytes)
+    if dedup is None:
+        return entropy
+    if dedup.entropy_bytes != entropy_bytes:
+        raise ValueError(f"The dedup index is for {dedup.words_per_phrase}-word phrases.")
+    entropy = dedup.filter(entropy)
+    while len(entropy) < num_phrases * entropy_bytes:
+        entropy += dedup.filter(os.urandom(num_phrases * entropy_bytes - len(entropy)))
+    return entropy
+
+def generate_mnemonic_phrases(num_phrases, words_per_phrase, dedup=None):
+    """Generate BIP39 phrases with valid checksums, using one entropy read for the whole batch.
+
+    With a dedup PhraseIndex, phrases issued before are never returned again.
+    """
+    if words_per_phrase not in VALID_WORD_COUNTS:
+        raise ValueError(f"Words per phrase must be one of {', '.join(map(str, VALID_WORD_COUNTS))}.")
+
+    try:
+        # 12, 15, 18, 21 and 24 words carry 128, 160, 192, 224 and 256 bits of entropy
+        with get_instrumentation().span("generate"):
+            entropy = _draw_entropy(num_phrases, words_per_phrase * 4 // 3, dedup)
+            phrases = entropy_to_phrases(entropy, words_per_phrase)
+        get_instrumentation().count("phrases", num_phrases)
+    except Exception as e:
+        logging.error(f"Error occurred during mnemonic phrase generation: {e}")
+        raise  # Re-raise the exception for higher-level handling
+
+    return phrases
+
+def iter_mnemonic_phrases(num_phrases, words_per_phrase, chunk_size=10000, dedup=None):
+    """Yield phrases one by one, generating them in chunks so memory stays flat for any count."""
+    remaining = num_phrases
+    while remaining > 0:
+        count = min(chunk_size, remaining)
+        yield from generate_mnemonic_phrases(count, words_per_phrase, dedup=dedup)
+        remaining -= count
+
+def open_phrase_output(output_file, compression=None):
+    """Open a text stream for phrases: stdout for '-', otherwise a plain, gzip or zstd file."""
+    if output_file == "-":
+        return sys.stdout
+    if compression is None:
+        if output_file.endswith(".gz"):
+            compression = "gzip"
+        elif output_file.endswith(".zst"):
+            compression = "zstd"
+
+    if compression == "gzip":
+        return gzip.open(output_file, "wt", compresslevel=6)
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError:
+            raise ValueError("zstd compression requires the 'zstandard' package (pip install zstandard).")
+        return io.TextIOWrapper(zstandard.ZstdCompressor().stream_writer(open(output_file, "wb")))
+    return open(output_file, "w")
+
+def write_phrases_to_file(phrases, output_file, compression=None, buffer_size=1 << 20, total=None, progress=False):
+    """Write phrases from any iterable in large chunks and return how many were written."""
+    output = open_phrase_output(output_file, compression)
+    written = 0
+    last_report = time.monotonic()
+    try:
+        chunk = []
+        chunk_bytes = 0
+        for phrase in phrases:
+            chunk.append(phrase)
+            chunk_bytes += len(phrase) + 1
+            if chunk_bytes >= buffer_size:
+                with get_instrumentation().span("write"):
+                    output.write("\n".join(chunk) + "\n")
+                written += len(chunk)
+                chunk = []
+                chunk_bytes = 0
+                if progress and time.monotonic() - last_report >= 1:
+                    last_report = time.monotonic()
+                    logging.info(f"Wrote {written}{f' of {total}' if total else ''} phrases...")
+        if chunk:
+            with get_instrumentation().span("write"):
+                output.write("\n".join(chunk) + "\n")
+            written += len(chunk)
+        get_instrumentation().count("phrases_written", written)
+    except Exception as e:
+        logging.error(f"Error occurred while writing phrases to file: {e}")
+        raise  # Re-raise the exception for higher-level handling
+    finally:
+        if output is sys.stdout:
+            output.flush()
+        else:
+            output.close()
+    return written
+
+def write_packed_phrases(num_phrases, words_per_phrase, output_file, chunk_size=10000, dedup=None):
+    """Write phrases as raw entropy records behind a small header and return how many were written.
+
+    Each record holds only the phrase entropy (16 bytes for 12 words, 32 for
+    24); words and checksum are recomputed when the file is read back.
+    """
+    if words_per_phrase not in VALID_WORD_COUNTS:
+        raise ValueError(f"Words per phrase must be one of {', '.join(map(str, VALID_WORD_COUNTS))}.")
+    if output_file == "-":
+        raise ValueError("The binary format needs a seekable output file, not stdout.")
+
+    entropy_bytes = words_per_phrase * 4 // 3
+    written = 0
+    try:
+        with open(output_file, "wb") as file:
+            # The record count is patched into the header once all records are written
+            file.write(PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, words_per_phrase, PACKED_WORDLIST_ENGLISH, 0, 0))
+            while written < num_phrases:
+                count = min(chunk_size, num_phrases - written)
+                with get_instrumentation().span("write"):
+                    file.write(_draw_entropy(count, entropy_bytes, dedup))
+                written += count
+            get_instrumentation().count("phrases_written", written)
+            file.seek(0)
+            file.write(PACKED_HEADER.pack(PACKED_MAGIC, PACKED_VERSION, words_per_phrase, PACKED_WORDLIST_ENGLISH, 0, written))
+    except Exception as e:
+        logging.error(f"Error occurred while writing packed phrases to file: {e}")
+        raise  # Re-raise the exception for higher-level handling
+    return written
+
+class PackedPhraseReader:
+    """Random access to a packed phrase file through a read-only memory map."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty, not a packed phrase file.")
+
+        if len(self._map) < PACKED_HEADER.size:
+            self.close()
+            raise ValueError(f"{path} is too short to be a packed phrase file.")
+        magic, version, self.words_per_phrase, wordlist_id, _, self.record_count = PACKED_HEADER.unpack_from(self._map)
+        self.entropy_bytes = self.words_per_phrase * 4 // 3
+        if magic != PACKED_MAGIC or version != PACKED_VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a packed phrase file (or uses an unsupported version).")
+        if wordlist_id != PACKED_WORDLIST_ENGLISH or self.words_per_phrase not in VALID_WORD_COUNTS:
+            self.close()
+            raise ValueError(f"{path} uses an unsupported wordlist or word count.")
+        if len(self._map) != PACKED_HEADER.size + self.record_count * self.entropy_bytes:
+            self.close()
+            raise ValueError(f"{path} is truncated or has trailing data.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __len__(self):
+        return self.record_count
+
+    def entropy(self, index):
+        """Return the raw entropy of record ``index``."""
+        if index < 0:
+            index += self.record_count
+        if not 0 <= index < self.record_count:
+            raise IndexError(f"Record {index} is out of range (file has {self.record_count} records).")
+        offset = PACKED_HEADER.size + index * self.entropy_bytes
+        return self._map[offset:offset + self.entropy_bytes]
+
+    def __getitem__(self, index):
+        return entropy_to_phrases(self.entropy(index), self.words_per_phrase)[0]
+
+    def __iter__(self):
+        # Decode in chunks so the batched word index split can be used
+        for start in range(0, self.record_count, 10000):
+            count = min(10000, self.record_count - start)
+            offset = PACKED_HEADER.size + start * self.entropy_bytes
+            yield from entropy_to_phrases(self._map[offset:offset + count * self.entropy_bytes], self.words_per_phrase)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
@@ -0,0 +1,67 @@
+import argparse
+import csv
+import io
+import json
+
+OUTPUT_FORMATS = ("text", "jsonl", "csv")
+
+def plain_output_requested(argv=None):
+    """Return True if the command line asks for a machine-readable --output-format."""
+    # Checked before the real parser is built, whose help strings would otherwise import colorama
+    parser = argparse.ArgumentParser(add_help=False, allow_abbrev=False)
+    parser.add_argument("--output-format", default="text")
+    args, _ = parser.parse_known_args(argv)
+    return args.output_format != "text"
+
+class RecordFormatter:
+    """Turn result records (dicts) into output lines.
+
+    ``text`` writes the ``text_fields`` of a record separated by tabs, the
+    interactive output the command line always had. ``jsonl`` writes the
+    ``fields`` of a record as one JSON object per line and ``csv`` as one row
+    after a header row; a missing field is written as null or an empty cell.
+    Neither contains color codes.
+    """
+
+    def __init__(self, output_format, fields, text_fields=None):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format '{output_format}'. Choose from: {', '.join(OUTPUT_FORMATS)}.")
+        self.output_format = output_format
+        self.fields = tuple(fields)
+        self.text_fields = tuple(text_fields or fields)
+        self._buffer = io.StringIO()
+        self._writer = csv.writer(self._buffer, lineterminator="\n")
+
+    @property
+    def is_text(self):
+        return self.output_format == "text"
+
+    def header(self, note=""):
+        """Return what precedes the records: the note (e.g. the work factor comment) for text, the header row for CSV."""
+        if self.output_format == "csv":
+            return self._csv_row(self.fields)
+        return note if self.is_text else ""
+
+    def _csv_row(self, values):
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._writer.writerow(values)
+        return self._buffer.getvalue()
+
+    def format(self, record):
+        """Return one record as a line ending in a newline."""
+        if self.output_format == "jsonl":
+            return json.dumps({field: record.get(field) for field in self.fields}) + "\n"
+        if self.output_format == "csv":
+            return self._csv_row([record.get(field) for field in self.fields])
+        return "\t".join(str(record[field]) for field in self.text_fields) + "\n"
+
+    def format_phrases(self, phrases):
+        """Yield phrases as lines without the newline, the shape write_phrases_to_file expects."""
+        if self.is_text:
+            yield from phrases
+            return
+        if self.output_format == "csv":
+            yield self.header()[:-1]
+        for phrase in phrases:
+            yield self.format({"phrase": phrase})[:-1]
@@ -0,0 +1,131 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import signal
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from .console import Fore
+from .derivation import PASSWORD_SCHEMES, generate_password_from_mnemonic
+from .kdf import DEFAULT_PROFILE, describe_profile
+from .wordlist import check_mnemonic_phrase, get_wordlist
+
+def _warm_worker():
+    # Submitted once per pool process at startup so that process creation and
+    # imports are paid before the first request arrives
+    return os.getpid()
+
+class PasswordServer:
+    """Serve password derivations over a Unix socket or localhost TCP with a warm process pool.
+
+    Requests and responses are JSON objects, one per line. A request looks like
+    ``{"id": 1, "mnemonic": "...", "length": 16, "symbols": true, "scheme": "legacy"}``
+    and is answered with ``{"id": 1, "password": "..."}`` or ``{"id": 1, "error": "..."}``.
+    Responses are written as soon as each derivation finishes, so they may
+    arrive out of order. Identical requests that are in flight at the same
+    time share one derivation, and each connection may only have
+    ``client_concurrency`` requests in flight. With ``verify_checksum=False``
+    phrases with a mismatching BIP39 checksum (e.g. truncated phrases from
+    older versions) are accepted.
+    """
+
+    def __init__(self, workers=0, client_concurrency=4, profile=None, verify_checksum=True):
+        self.workers = workers or os.cpu_count() or 1
+        self.client_concurrency = client_concurrency
+        self.profile = profile
+        self.verify_checksum = verify_checksum
+        # Sent with every password so clients know which settings produced it
+        self.work_factor = describe_profile(profile or DEFAULT_PROFILE)
+        self._executor = None
+        self._inflight = {}
+
+    async def serve(self, socket_path=None, host="127.0.0.1", port=8765):
+        """Start the worker pool and serve requests until cancelled."""
+        logger = logging.getLogger(__name__)
+        loop = asyncio.get_running_loop()
+        try:
+            # Stop cleanly when a service manager asks the daemon to terminate
+            loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except NotImplementedError:  # Signal handlers are not available on Windows event loops
+            pass
+        # Build the wordlist before the pool forks so that every worker shares it
+        get_wordlist()
+        self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        try:
+            await asyncio.gather(*(loop.run_in_executor(self._executor, _warm_worker) for _ in range(self.workers)))
+            if socket_path:
+                server = await asyncio.start_unix_server(self._handle_client, path=socket_path)
+                logger.info(Fore.GREEN + f"Serving on {socket_path} with {self.workers} workers...")
+            else:
+                server = await asyncio.start_server(self._handle_client, host=host, port=port)
+                logger.info(Fore.GREEN + f"Serving on {host}:{port} with {self.workers} workers...")
+            async with server:
+                await server.serve_forever()
+        finally:
+            self._executor.shutdown(cancel_futures=True)
+            if socket_path and os.path.exists(socket_path):
+                os.unlink(socket_path)
+
+    async def derive(self, mnemonic_phrase, password_length=12, use_symbols=True, scheme="legacy"):
+        """Derive a password on the pool, sharing the work with identical in-flight requests."""
+        # Only a hash of the request is kept as the coalescing key
+        request_key = hashlib.sha256(json.dumps([mnemonic_phrase, password_length, use_symbols, scheme]).encode()).digest()
+        future = self._inflight.get(request_key)
+        if future is None:
+            task = partial(generate_password_from_mnemonic, mnemonic_phrase, password_length=password_length,
+                           use_symbols=use_symbols, scheme=scheme, verify_checksum=self.verify_checksum, profile=self.profile)
+            future = asyncio.get_running_loop().run_in_executor(self._executor, task)
+            self._inflight[request_key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(request_key, None))
+        return await asyncio.shield(future)
+
+    async def _handle_client(self, reader, writer):
+        slots = asyncio.Semaphore(self.client_concurrency)
+        tasks = set()
+        try:
+            while True:
+                # Stop reading from this client while it has too many requests in flight
+                await slots.acquire()
+                line = await reader.readline()
+                if not line:
+                    slots.release()
+                    break
+                task = asyncio.create_task(self._answer(line, writer, slots))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                # One failed request must not drop the answers of the others on this connection
+                await asyncio.gather(*tasks, return_exceptions=True)
+        except ConnectionError:
+            for task in tasks:
+                task.cancel()
+        finally:
+            writer.close()
+
+    async def _answer(self, line, writer, slots):
+        request_id = None
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            mnemonic_phrase = " ".join(str(request["mnemonic"]).split())
+            password_length = int(request.get("length", 12))
+            use_symbols = bool(request.get("symbols", True))
+            scheme = request.get("scheme", "legacy")
+            if scheme not in PASSWORD_SCHEMES:
+                raise ValueError(f"Unknown password scheme '{scheme}'.")
+            if not 1 <= password_length <= 1024:
+                raise ValueError("Password length must be between 1 and 1024.")
+            reason = check_mnemonic_phrase(mnemonic_phrase, verify_checksum=self.verify_checksum)
+            if reason is not None:
+                raise ValueError(reason)
+            response = {"id": request_id, "password": await self.derive(mnemonic_phrase, password_length, use_symbols, scheme),
+                        "work_factor": self.work_factor}
+        except Exception as e:
+            # Every request is answered, including overflowing numbers and a broken worker pool
+            response = {"id": request_id, "error": str(e) or type(e).__name__}
+        finally:
+            slots.release()
+        writer.write((json.dumps(response) + "\n").encode())
+        await writer.drain()
@@ -0,0 +1,109 @@
+import hashlib
+import os
+import threading
+
+# Bundled BIP39 English wordlist and the phrase lengths it supports. The
+# list is read on first use rather than at import time.
+WORDLIST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bip-0039_english_wordlist.txt")
+VALID_WORD_COUNTS = (12, 15, 18, 21, 24)
+
+_wordlist = None
+_wordlist_lock = threading.Lock()
+
+class Wordlist:
+    """The BIP39 wordlist as an immutable object: words in index order plus word and prefix lookups.
+
+    One instance is built per process on first use and shared by phrase
+    generation, validation and password derivation. Pool processes forked
+    after it is built inherit it copy-on-write instead of loading their own.
+    The lookup dicts are shared too and must not be modified.
+    """
+
+    __slots__ = ("words", "index", "prefixes")
+
+    def __init__(self, words):
+        words = tuple(words)
+        if len(words) != 2048:
+            raise ValueError(f"BIP39 wordlist must contain 2048 words, found {len(words)}.")
+        object.__setattr__(self, "words", words)
+        object.__setattr__(self, "index", {word: index for index, word in enumerate(words)})
+        # BIP39 English words are unique in their first four letters
+        object.__setattr__(self, "prefixes", {word[:4]: index for index, word in enumerate(words)})
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Wordlist is immutable.")
+
+    def __len__(self):
+        return len(self.words)
+
+    def __getitem__(self, index):
+        return self.words[index]
+
+def get_wordlist():
+    """Return the process-wide Wordlist, reading the bundled file (or mnemonic's copy) on first use."""
+    global _wordlist
+    if _wordlist is None:
+        with _wordlist_lock:
+            if _wordlist is None:
+                if os.path.exists(WORDLIST_PATH):
+                    with open(WORDLIST_PATH, "r") as file:
+                        words = [line.strip() for line in file if line.strip()]
+                else:
+                    from mnemonic import Mnemonic
+                    words = Mnemonic("english").wordlist
+                _wordlist = Wordlist(words)
+    return _wordlist
+
+def load_wordlist():
+    """Return the BIP39 English words as a tuple in index order."""
+    return get_wordlist().words
+
+def load_word_index():
+    """Return the word -> index map and the 4-letter prefix -> index map."""
+    wordlist = get_wordlist()
+    return wordlist.index, wordlist.prefixes
+
+def check_mnemonic_phrase(mnemonic_phrase, verify_checksum=True, allow_abbreviations=False):
+    """Return None if the phrase is a valid BIP39 phrase, otherwise the reason it is not."""
+    words = mnemonic_phrase.split()
+    if len(words) not in VALID_WORD_COUNTS:
+        return f"Mnemonic phrase must be 12, 15, 18, 21, or 24 words, got {len(words)}."
+
+    wordlist = get_wordlist()
+    word_index = wordlist.index
+    value = 0
+    for position, word in enumerate(words, start=1):
+        index = word_index.get(word)
+        if index is None and allow_abbreviations and len(word) >= 4:
+            index = wordlist.prefixes.get(word[:4])
+            if index is not None and not wordlist.words[index].startswith(word):
+                index = None
+        if index is None:
+            return f"Unknown word '{word}' at position {position}."
+        value = (value << 11) | index
+
+    if verify_checksum:
+        # The last ENT/32 bits are the leading bits of SHA-256(entropy)
+        checksum_bits = len(words) // 3
+        entropy = (value >> checksum_bits).to_bytes(len(words) * 4 // 3, 'big')
+        if value & ((1 << checksum_bits) - 1) != hashlib.sha256(entropy).digest()[0] >> (8 - checksum_bits):
+            return "Mnemonic phrase checksum does not match."
+    return None
+
+def is_valid_mnemonic_phrase(mnemonic_phrase, verify_checksum=True):
+    """Check if the provided mnemonic phrase is valid."""
+    return check_mnemonic_phrase(mnemonic_phrase, verify_checksum=verify_checksum) is None
+
+def validate_mnemonic_file(input_file, verify_checksum=True, allow_abbreviations=False):
+    """Yield (line_number, reason) for every non-blank line of a file that is not a valid phrase.
+
+    The defaults match the checks done before derivation, so a file that
+    validates cleanly does not fail in batch mode.
+    """
+    with open(input_file, "r") as file:
+        for line_number, line in enumerate(file, start=1):
+            if line.isspace() or not line:
+                continue
+            reason = check_mnemonic_phrase(line, verify_checksum=verify_checksum, allow_abbreviations=allow_abbreviations)
+            if reason is not None:
+                yield line_number, reason
@@ -0,0 +1,64 @@
+import hashlib
+
+import pytest
+
+from pypassgen.derivation import DerivationCache, PasswordVault, generate_password_from_mnemonic, password_characters
+
+PHRASE = ("drama coral never fluid require pole attend liar fun hammer hurt match update scare garbage pluck scrap "
+          "valve catch primary basic borrow believe safe")
+
+# One iteration per stage keeps the vectors fast; the code paths are the same as with the default work factor
+CHEAP = {"stage1_iterations": 1, "character_iterations": 1}
+
+LEGACY_20 = "PQ%=2M$e_+!:jk>{f:44"
+LEGACY_25_NO_SYMBOLS = "LciraK9eKVspbozMfhSgdlWzK"
+LEGACY_VAULT_16 = "qrlPQJ,qoK!?J-f{"
+V2_24 = "uIp]g5;ei}bazF0uy1ybbEML"
+V2_24_NO_SYMBOLS = "u85PXPG5pS3Ei7RBoAZZF0uP"
+V2_VAULT_16 = "2)$Nw{N*C.^9!&^q"
+
+def reference_password(phrase, password_length, use_symbols=True, label=b"", stage1_iterations=8192,
+                       character_iterations=1000000):
+    """The original derivation loop, one PBKDF2 call per character, with the iteration counts as parameters."""
+    from mnemonic import Mnemonic
+    key = hashlib.pbkdf2_hmac('sha512', Mnemonic.to_seed(phrase), b'password', stage1_iterations)
+    characters = password_characters(use_symbols)
+    password = ''
+    while len(password) < password_length:
+        salt = label + b":" + str(len(password)).encode() if label else str(len(password)).encode()
+        digest = hashlib.pbkdf2_hmac('sha512', key, salt, character_iterations)
+        password += characters[int.from_bytes(digest, 'big') % len(characters)]
+    return password
+
+def test_reference_matches_vectors():
+    assert reference_password(PHRASE, 20, stage1_iterations=1, character_iterations=1) == LEGACY_20
+    assert reference_password(PHRASE, 25, use_symbols=False, stage1_iterations=1, character_iterations=1) == LEGACY_25_NO_SYMBOLS
+    assert reference_password(PHRASE, 16, label=b"example.com", stage1_iterations=1, character_iterations=1) == LEGACY_VAULT_16
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_legacy_vectors(workers):
+    assert generate_password_from_mnemonic(PHRASE, 20, workers=workers, profile=CHEAP) == LEGACY_20
+    assert generate_password_from_mnemonic(PHRASE, 25, use_symbols=False, workers=workers, profile=CHEAP) == LEGACY_25_NO_SYMBOLS
+
+def test_cached_legacy_vectors():
+    # The second password reuses the first 20 digests and only maps them onto another character set
+    cache = DerivationCache()
+    assert generate_password_from_mnemonic(PHRASE, 20, cache=cache, profile=CHEAP) == LEGACY_20
+    assert generate_password_from_mnemonic(PHRASE, 25, use_symbols=False, cache=cache, profile=CHEAP) == LEGACY_25_NO_SYMBOLS
+    assert cache.stats()["hits"] == 20
+    assert cache.stats()["misses"] == 25
+
+def test_vault_legacy_vector():
+    with PasswordVault(PHRASE, profile=CHEAP) as vault:
+        assert vault.derive("example.com", 16) == LEGACY_VAULT_16
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_v2_vectors(workers):
+    assert generate_password_from_mnemonic(PHRASE, 24, workers=workers, scheme="v2", profile=CHEAP) == V2_24
+    assert generate_password_from_mnemonic(PHRASE, 24, use_symbols=False, workers=workers, scheme="v2", profile=CHEAP) == V2_24_NO_SYMBOLS
+    # The expansion is a stream, so a shorter v2 password is a prefix of a longer one
+    assert generate_password_from_mnemonic(PHRASE, 20, workers=workers, scheme="v2", profile=CHEAP) == V2_24[:20]
+
+def test_vault_v2_vector():
+    with PasswordVault(PHRASE, profile=CHEAP) as vault:
+        assert vault.derive("example.com", 16, scheme="v2") == V2_VAULT_16
@@ -0,0 +1,31 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from pypassgen.bench import PROJECT_ROOT, measure_import_time
+
+# Importing the command line modules must stay cheap: these are loaded on
+# demand by the modes that need them, never at startup
+HEAVY_MODULES = ("mnemonic", "colorama", "numpy")
+
+# Generous against the ~50ms measured on a laptop, so only a real regression fails
+STARTUP_BUDGET_MS = 150
+
+@pytest.mark.parametrize("module", ["pypassgen.cli", "pypassgen.generator_cli"])
+def test_import_skips_heavy_modules(module):
+    code = f"import sys, {module}; print(' '.join(name for name in {HEAVY_MODULES!r} if name in sys.modules))"
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.split() == [], f"importing {module} pulled in {result.stdout.strip()}"
+
+def test_plain_output_skips_colorama():
+    code = (f"import sys; sys.argv = ['passv2.py', '--output-format', 'jsonl', '--validate', {os.devnull!r}]; "
+            "from pypassgen.cli import main; main(); print('colorama' in sys.modules)")
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "False"
+
+def test_cli_import_time_within_budget():
+    # Best of three, so that one slow run on a busy machine does not fail the check
+    milliseconds = min(measure_import_time("pypassgen.cli") for _ in range(3)) * 1000
+    assert milliseconds <= STARTUP_BUDGET_MS, f"importing pypassgen.cli took {milliseconds:.1f}ms (budget {STARTUP_BUDGET_MS}ms)"